@@ -1,34 +1,88 @@
 from __future__ import annotations
 
-import json
+import sys
 import threading
 import time
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Tuple
 
+from iphoneclaw.types import DATACLASS_SLOTS
 
-@dataclass
+
+@dataclass(**DATACLASS_SLOTS)
 class ConversationItem:
     role: str  # "system" | "user" | "assistant"
     text: str
     ts: float = 0.0
     meta: Dict[str, Any] = field(default_factory=dict)
+    _message: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+
+    def as_openai_message(self) -> Dict[str, Any]:
+        # Built once and shared by every prompt that includes this item; treat as read-only.
+        msg = self._message
+        if msg is None:
+            msg = self._message = {"role": self.role, "content": self.text}
+        return msg
+
+
+def _evict_oldest_rounds(
+    items: Tuple[ConversationItem, ...], limit: int
+) -> Tuple[ConversationItem, ...]:
+    """
+    Trim history to at most `limit` items. The most recent system item is always kept
+    (clear(keep_last_system=True) relies on it); everything else is cut at a round
+    boundary, so the retained tail starts with a user item and never with an orphaned
+    assistant reply.
+    """
+    n = len(items)
+    sys_pos = -1
+    for i in range(n - 1, -1, -1):
+        if items[i].role == "system":
+            sys_pos = i
+            break
+    others = [i for i in range(n) if i != sys_pos]
+    start = max(0, len(others) - (limit - (1 if sys_pos >= 0 else 0)))
+    while start < len(others) and items[others[start]].role != "user":
+        start += 1
+    cut = others[start] if start < len(others) else n
+    return tuple(it for i, it in enumerate(items) if i >= cut or i == sys_pos)
 
 
 class ConversationStore:
-    def __init__(self) -> None:
+    """
+    Conversation history shared by the worker loop and the supervisor API.
+
+    Writers build a new immutable snapshot and publish it under a lock; readers take the
+    current snapshot with a single attribute load and never block on the writer.
+    """
+
+    def __init__(self, *, max_items: int = 0) -> None:
+        # Optional history bound: once exceeded, the oldest rounds are evicted on add
+        # (the latest system item is kept). 0 means unbounded.
+        self._max_items = max(0, int(max_items))
+        # Serializes writers only; readers go through _snap.
         self._lock = threading.Lock()
-        self._items: List[ConversationItem] = []
+        # (items, positions of assistant items in ascending order), published together so
+        # readers always see a consistent pair. Tail slicing by rounds uses the positions
+        # instead of rescanning the whole history.
+        self._snap: Tuple[Tuple[ConversationItem, ...], Tuple[int, ...]] = ((), ())
 
     def add(self, role: str, text: str, **meta: Any) -> None:
+        # Interned so role checks in the tail scans hit the identity fast path.
+        role = sys.intern(role)
+        it = ConversationItem(role=role, text=text, ts=time.time(), meta=dict(meta))
         with self._lock:
-            self._items.append(
-                ConversationItem(role=role, text=text, ts=time.time(), meta=dict(meta))
-            )
+            items, assistant_idx = self._snap
+            if role == "assistant":
+                assistant_idx = assistant_idx + (len(items),)
+            items = items + (it,)
+            if self._max_items and len(items) > self._max_items:
+                items = _evict_oldest_rounds(items, self._max_items)
+                assistant_idx = tuple(i for i, x in enumerate(items) if x.role == "assistant")
+            self._snap = (items, assistant_idx)
 
     def items(self) -> List[ConversationItem]:
-        with self._lock:
-            return list(self._items)
+        return list(self._snap[0])
 
     def to_openai_messages(
         self, *, include_system: bool = True, tail_rounds: int = 5
@@ -36,32 +90,24 @@ class ConversationStore:
         """
         Convert to OpenAI-compatible message list (text only).
         'tail_rounds' counts assistant turns.
+        The message dicts are cached per item and shared across calls; do not mutate them.
         """
         items = self._tail_items_by_rounds(tail_rounds)
-        out: List[Dict[str, Any]] = []
-        for it in items:
-            if it.role == "system" and not include_system:
-                continue
-            out.append({"role": it.role, "content": it.text})
-        return out
-
-    def _tail_items_by_rounds(self, tail_rounds: int) -> List[ConversationItem]:
-        with self._lock:
-            items = list(self._items)
-
-        assistant_seen = 0
-        start_idx = 0
-        for i in range(len(items) - 1, -1, -1):
-            if items[i].role == "assistant":
-                assistant_seen += 1
-                if assistant_seen >= tail_rounds:
-                    start_idx = i
-                    break
+        if include_system:
+            return [it.as_openai_message() for it in items]
+        return [it.as_openai_message() for it in items if it.role != "system"]
+
+    def _tail_items_by_rounds(self, tail_rounds: int) -> Tuple[ConversationItem, ...]:
+        n = max(1, int(tail_rounds))
+        items, assistant_idx = self._snap
+        if len(assistant_idx) < n:
+            # Fewer rounds than requested: the whole (immutable) snapshot, no copy.
+            return items
+        start_idx = assistant_idx[-n]
         # Ensure we include the user prompt that triggered the first assistant turn.
-        if start_idx > 0 and items[start_idx].role == "assistant":
-            if items[start_idx - 1].role == "user":
-                start_idx -= 1
-        return items[start_idx:] if items else []
+        if start_idx > 0 and items[start_idx - 1].role == "user":
+            start_idx -= 1
+        return items[start_idx:]
 
     def tail_rounds(self, tail_rounds: int) -> List[Dict[str, Any]]:
         sliced = self._tail_items_by_rounds(tail_rounds)
@@ -84,20 +130,21 @@ class ConversationStore:
         Returns the number of items removed.
         """
         with self._lock:
-            before = len(self._items)
-            if not self._items:
+            items = self._snap[0]
+            before = len(items)
+            if not items:
                 return 0
             if not keep_last_system:
-                self._items.clear()
+                self._snap = ((), ())
                 return before
             # Keep the last system message if present; otherwise clear all.
             last_sys = None
-            for it in reversed(self._items):
+            for it in reversed(items):
                 if it.role == "system":
                     last_sys = it
                     break
-            self._items = [last_sys] if last_sys is not None else []
-            return before - len(self._items)
+            self._snap = (((last_sys,) if last_sys is not None else ()), ())
+            return before - len(self._snap[0])
 
     def trim_tail_rounds(self, drop_rounds: int) -> int:
         """
@@ -108,21 +155,17 @@ class ConversationStore:
         if n <= 0:
             return 0
         with self._lock:
-            before = len(self._items)
-            if before == 0:
+            items, assistant_idx = self._snap
+            dropped = assistant_idx[len(assistant_idx) - min(n, len(assistant_idx)):]
+            if not dropped:
                 return 0
-
-            assistant_dropped = 0
-            # Walk backwards and remove messages belonging to the last N assistant rounds.
-            i = len(self._items) - 1
-            while i >= 0 and assistant_dropped < n:
-                if self._items[i].role == "assistant":
-                    # Remove this assistant message.
-                    del self._items[i]
-                    # Also remove the triggering user message immediately before, if it exists.
-                    if i - 1 >= 0 and self._items[i - 1].role == "user":
-                        del self._items[i - 1]
-                        i -= 1
-                    assistant_dropped += 1
-                i -= 1
-            return before - len(self._items)
+            drop = set(dropped)
+            for p in dropped:
+                if p > 0 and items[p - 1].role == "user":
+                    drop.add(p - 1)
+            # Only the newest assistant rounds are dropped, so earlier positions stay valid.
+            self._snap = (
+                tuple(it for i, it in enumerate(items) if i not in drop),
+                assistant_idx[: len(assistant_idx) - len(dropped)],
+            )
+            return len(drop)
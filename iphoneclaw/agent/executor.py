@@ -1,291 +1,377 @@
 from __future__ import annotations
 
 import time
-from dataclasses import asdict
-from typing import Any, Dict, Optional, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
 
 from iphoneclaw.agent.coords import model_point_to_screen
 from iphoneclaw.config import Config
 from iphoneclaw.macos import input_mouse
 import sys
-import math
 
 from iphoneclaw.macos.input_keyboard import paste_text, press
 from iphoneclaw.macos.applescript_typing import type_text_macos_applescript
 from iphoneclaw.parse.action_parser import parse_box_point
 from iphoneclaw.parse.hotkey_map import maybe_rewrite_hotkey
-from iphoneclaw.types import PredictionParsed, Rect, ScreenshotOutput
+from iphoneclaw.types import (
+    DATACLASS_SLOTS,
+    ActionInputs,
+    ActionResult,
+    PredictionParsed,
+    Rect,
+    ScreenshotOutput,
+)
+
+_IS_DARWIN = sys.platform == "darwin"
+
+# Both parsers are pure and their inputs (box strings, hotkey names) repeat heavily
+# within a run, so memoize them locally.
+_parse_box_point = lru_cache(maxsize=256)(parse_box_point)
+_maybe_rewrite_hotkey = lru_cache(maxsize=256)(maybe_rewrite_hotkey)
+
+_CMD_MODS = ("cmd",)
+
+
+@lru_cache(maxsize=64)
+def _parse_hotkey(key: str) -> Tuple[Tuple[str, ...], str]:
+    """'cmd shift p' -> (('cmd', 'shift'), 'p')."""
+    parts = key.strip().lower().split()
+    if not parts:
+        raise ValueError("missing key")
+    return tuple(parts[:-1]), parts[-1]
 
 
 def _box_to_xy(box: Optional[str], bounds: Rect, factor: int) -> Optional[Tuple[float, float]]:
-    pt = parse_box_point(box)
+    pt = _parse_box_point(box)
     if not pt:
         return None
     return model_point_to_screen(pt[0], pt[1], bounds=bounds, coord_factor=factor)
 
-def _clamp_xy(x: float, y: float, bounds: Rect) -> Tuple[float, float]:
-    cx = max(bounds.x + 1.0, min(bounds.x + bounds.width - 2.0, x))
-    cy = max(bounds.y + 1.0, min(bounds.y + bounds.height - 2.0, y))
+@lru_cache(maxsize=8)
+def _swipe_threshold_sq(width: float, height: float) -> float:
+    """Squared drag length above which a drag is treated as a swipe (window size is stable)."""
+    t = max(220.0, min(width, height) * 0.25)
+    return t * t
+
+def _clamp_limits(bounds: Rect) -> Tuple[float, float, float, float]:
+    """(xmin, xmax, ymin, ymax) for _clamp_xy; compute once per action, not per point."""
+    return (
+        bounds.x + 1.0,
+        bounds.x + bounds.width - 2.0,
+        bounds.y + 1.0,
+        bounds.y + bounds.height - 2.0,
+    )
+
+def _clamp_xy(x: float, y: float, lim: Tuple[float, float, float, float]) -> Tuple[float, float]:
+    xmin, xmax, ymin, ymax = lim
+    # Same result as max(lo, min(hi, v)), without the builtin calls.
+    cx = x if x < xmax else xmax
+    cx = cx if cx > xmin else xmin
+    cy = y if y < ymax else ymax
+    cy = cy if cy > ymin else ymin
     return (cx, cy)
 
-def _dist(a: Tuple[float, float], b: Tuple[float, float]) -> float:
-    return math.hypot(a[0] - b[0], a[1] - b[1])
+# Cursor-restore tolerance (px), compared squared to skip the sqrt.
+_RESTORE_RADIUS_SQ = 80.0 * 80.0
 
 
 def execute_action(
     cfg: Config,
     pred: PredictionParsed,
     screenshot: ScreenshotOutput,
-) -> Dict[str, Any]:
+) -> ActionResult:
     """
-    Execute one parsed action. Returns a dict suitable for recording.
+    Execute one parsed action. Returns an ActionResult; use .to_dict() for recording.
     """
-    t0 = time.time()
+    # Single clock read pair for every exit path (early returns included).
+    t0 = time.monotonic_ns()
+    out = _execute_action(cfg, pred, screenshot)
+    out.dt = (time.monotonic_ns() - t0) * 1e-9
+    return out
+
+
+@dataclass(**DATACLASS_SLOTS)
+class _CursorTarget:
+    # Where the running action is about to leave the cursor, for best-effort restore.
+    # Handlers set it *before* the input call so the restore also runs if that call raises.
+    xy: Optional[Tuple[float, float]] = None
+
+
+# Handlers take (cfg, ai, bounds, factor, cursor); mouse handlers record their target in cursor.
+_Handler = Callable[[Config, ActionInputs, Rect, int, _CursorTarget], None]
+
+
+def _handle_click(cfg: Config, ai: ActionInputs, bounds: Rect, factor: int, cursor: _CursorTarget) -> None:
+    xy = _box_to_xy(ai.start_box, bounds, factor)
+    if not xy:
+        raise ValueError("missing start_box")
+    cursor.xy = xy
+    input_mouse.mouse_click(xy[0], xy[1], button="left")
+
+
+def _handle_double_click(cfg: Config, ai: ActionInputs, bounds: Rect, factor: int, cursor: _CursorTarget) -> None:
+    xy = _box_to_xy(ai.start_box, bounds, factor)
+    if not xy:
+        raise ValueError("missing start_box")
+    interval_ms = ai.interval_ms
+    if interval_ms is None:
+        interval_ms = int(cfg.double_click_interval_ms)
+    cursor.xy = xy
+    input_mouse.mouse_double_click(xy[0], xy[1], interval_s=float(interval_ms) / 1000.0)
+
+
+def _handle_right_single(cfg: Config, ai: ActionInputs, bounds: Rect, factor: int, cursor: _CursorTarget) -> None:
+    xy = _box_to_xy(ai.start_box, bounds, factor)
+    if not xy:
+        raise ValueError("missing start_box")
+    cursor.xy = xy
+    input_mouse.mouse_right_click(xy[0], xy[1])
+
+
+def _handle_drag(cfg: Config, ai: ActionInputs, bounds: Rect, factor: int, cursor: _CursorTarget) -> None:
+    sxy = _box_to_xy(ai.start_box, bounds, factor)
+    exy = _box_to_xy(ai.end_box, bounds, factor)
+    if not sxy or not exy:
+        raise ValueError("missing start_box/end_box")
+    # Heuristic: long-distance drags on iPhone are usually swipe gestures (page/back),
+    # where we must avoid a long-press that can start icon drag/rearrange.
+    dx = exy[0] - sxy[0]
+    dy = exy[1] - sxy[1]
+    is_swipe_like = (dx * dx + dy * dy) >= _swipe_threshold_sq(bounds.width, bounds.height)
+    cursor.xy = exy
+    if is_swipe_like:
+        input_mouse.mouse_drag(
+            sxy[0],
+            sxy[1],
+            exy[0],
+            exy[1],
+            duration=0.18,
+            hold_before_move_s=0.004,
+        )
+    else:
+        input_mouse.mouse_drag(
+            sxy[0],
+            sxy[1],
+            exy[0],
+            exy[1],
+            duration=0.45,
+            hold_before_move_s=0.02,
+        )
+
+
+def _handle_scroll(cfg: Config, ai: ActionInputs, bounds: Rect, factor: int, cursor: _CursorTarget) -> None:
+    xy = _box_to_xy(ai.start_box, bounds, factor)
+    if not xy:
+        # UI-TARS-desktop allows scroll(direction=...) without start_box.
+        xy = (bounds.x + bounds.width / 2.0, bounds.y + bounds.height / 2.0)
+    direction = (ai.direction or "").lower().strip()
+    lim = _clamp_limits(bounds)
+    xy = _clamp_xy(xy[0], xy[1], lim)
+
+    if cfg.scroll_mode == "drag":
+        # iOS-style scroll: use a short swipe gesture inside the window.
+        # For vertical: to scroll down (see more below), swipe up.
+        # For horizontal: match common "direction = swipe direction" expectation.
+        dist = max(80.0, min(bounds.height * 0.35, 520.0))
+        sx, sy = xy
+        if direction == "down":
+            ex, ey = sx, sy - dist
+        elif direction == "up":
+            ex, ey = sx, sy + dist
+        elif direction == "left":
+            ex, ey = sx - dist, sy
+        elif direction == "right":
+            ex, ey = sx + dist, sy
+        else:
+            raise ValueError("missing/invalid direction")
+        ex, ey = _clamp_xy(ex, ey, lim)
+        cursor.xy = (ex, ey)
+        input_mouse.mouse_drag(
+            sx, sy, ex, ey, duration=0.16, hold_before_move_s=0.004
+        )
+        return
+
+    cursor.xy = xy
+    input_mouse.mouse_scroll(
+        xy[0],
+        xy[1],
+        direction=direction,
+        amount=int(cfg.scroll_amount),
+        unit=str(cfg.scroll_unit),
+        repeat=int(cfg.scroll_repeat),
+        focus_click=bool(cfg.scroll_focus_click),
+        invert_y=bool(cfg.scroll_invert_y),
+    )
+
+
+def _handle_swipe(cfg: Config, ai: ActionInputs, bounds: Rect, factor: int, cursor: _CursorTarget) -> None:
+    # Swipe = rapid burst of scroll-wheel events (simulates trackpad two-finger swipe).
+    # Larger amount + more repeats than normal scroll for a page-level gesture.
+    xy = _box_to_xy(ai.start_box, bounds, factor)
+    if not xy:
+        xy = (bounds.x + bounds.width / 2.0, bounds.y + bounds.height / 2.0)
+    direction = (ai.direction or "").lower().strip()
+    if direction not in ("up", "down", "left", "right"):
+        raise ValueError("missing/invalid direction for swipe")
+    xy = _clamp_xy(xy[0], xy[1], _clamp_limits(bounds))
+    swipe_amount = 2000 if direction in ("up", "down") else 400
+    cursor.xy = xy
+    input_mouse.mouse_scroll(
+        xy[0], xy[1],
+        direction=direction,
+        amount=swipe_amount,
+        unit="pixel",
+        repeat=15,
+        focus_click=False,
+        invert_y=bool(cfg.scroll_invert_y),
+    )
+
+
+def _handle_hotkey(cfg: Config, ai: ActionInputs, bounds: Rect, factor: int, cursor: _CursorTarget) -> None:
+    # Expect "ctrl c" or "cmd shift p" style.
+    mods, k = _parse_hotkey(ai.key or "")
+    press(k, modifiers=mods)
+
+
+def _handle_type(cfg: Config, ai: ActionInputs, bounds: Rect, factor: int, cursor: _CursorTarget) -> None:
+    content = ai.content or ""
+    if cfg.type_ascii_only and not content.isascii():
+        raise ValueError(
+            "type(content=...) must be ASCII only. For Chinese, type pinyin (ASCII) "
+            "via the iPhone IME and select the Chinese candidate via clicks."
+        )
+    # Clipboard paste submits a trailing newline as an Enter key press.
+    press_enter = content.endswith("\n")
+    paste_body = content[:-1] if press_enter else content
+    if not _IS_DARWIN:
+        paste_text(paste_body, press_enter=press_enter)
+        return
+    # macOS: prefer AppleScript keystroke (matches UI-TARS-desktop behavior).
+    try:
+        # UI-TARS allows optional start_box for type() (focus first).
+        if ai.start_box:
+            xy = _box_to_xy(ai.start_box, bounds, factor)
+            if xy:
+                input_mouse.mouse_click(xy[0], xy[1], button="left")
+                time.sleep(0.05)
+        type_text_macos_applescript(
+            app_name=cfg.target_app,
+            content=content,
+            mode=cfg.applescript_mode,
+        )
+    except Exception:
+        # Fallback: clipboard paste.
+        paste_text(paste_body, press_enter=press_enter)
+
+
+def _handle_sleep(cfg: Config, ai: ActionInputs, bounds: Rect, factor: int, cursor: _CursorTarget) -> None:
+    # Fine-grained delays for multi-action sequences (e.g. click + sleep + click).
+    if ai.ms is not None:
+        time.sleep(max(0.0, float(ai.ms) / 1000.0))
+    elif ai.seconds is not None:
+        time.sleep(max(0.0, float(ai.seconds)))
+    else:
+        # Default: short sleep so it remains "fine-grained".
+        time.sleep(0.05)
+
+
+def _handle_wait(cfg: Config, ai: ActionInputs, bounds: Rect, factor: int, cursor: _CursorTarget) -> None:
+    time.sleep(5.0)
+
+
+_HANDLERS: Dict[str, _Handler] = {
+    "click": _handle_click,
+    "left_double": _handle_double_click,
+    "double_click": _handle_double_click,
+    "doubleclick": _handle_double_click,
+    "dblclick": _handle_double_click,
+    "right_single": _handle_right_single,
+    "drag": _handle_drag,
+    "scroll": _handle_scroll,
+    "swipe": _handle_swipe,
+    "hotkey": _handle_hotkey,
+    "type": _handle_type,
+    "sleep": _handle_sleep,
+    "wait": _handle_wait,
+}
+
+
+def _execute_action(
+    cfg: Config,
+    pred: PredictionParsed,
+    screenshot: ScreenshotOutput,
+) -> ActionResult:
     action_type = pred.action_type
     ai = pred.action_inputs
 
     # Stability rewrite layer for cmd 1/2/3.
-    rewrite = maybe_rewrite_hotkey(action_type, ai.key)
+    rewrite = _maybe_rewrite_hotkey(action_type, ai.key)
     if rewrite:
         action_type = rewrite
 
-    bounds = screenshot.window_bounds
-    factor = int(cfg.coord_factor)
+    terminal = action_type in ("finished", "call_user", "error_env")
+    out = ActionResult(
+        action_type=action_type,
+        raw_action_type=pred.action_type,
+        raw_action=pred.raw_action,
+        thought=pred.thought,
+        inputs=ai.to_dict(),
+    )
 
-    out: Dict[str, Any] = {
-        "action_type": action_type,
-        "raw_action_type": pred.action_type,
-        "raw_action": pred.raw_action,
-        "thought": pred.thought,
-        "inputs": asdict(ai),
-    }
-
-    if action_type in ("finished", "call_user", "error_env"):
-        out["skipped"] = True
-        out["reason"] = "terminal"
-        out["ok"] = True
-        out["dt"] = time.time() - t0
+    if terminal:
+        out.skipped = True
+        out.reason = "terminal"
+        out.ok = True
         return out
 
     if cfg.dry_run:
-        out["skipped"] = True
-        out["reason"] = "dry_run"
-        out["ok"] = True
-        out["dt"] = time.time() - t0
+        out.skipped = True
+        out.reason = "dry_run"
+        out.ok = True
         return out
 
     # iPhone specific shortcuts (mirroring app typically forwards these).
     if action_type == "iphone_home":
-        press("1", modifiers=["cmd"])
-        out["ok"] = True
-        out["dt"] = time.time() - t0
+        press("1", modifiers=_CMD_MODS)
+        out.ok = True
         return out
     if action_type == "iphone_app_switcher":
-        press("2", modifiers=["cmd"])
-        out["ok"] = True
-        out["dt"] = time.time() - t0
+        press("2", modifiers=_CMD_MODS)
+        out.ok = True
         return out
 
+    bounds = screenshot.window_bounds
+    factor = int(cfg.coord_factor)
+    handler = _HANDLERS.get(action_type)
+    # macOS has one shared cursor; best-effort restore so users can keep using their Mac.
+    pre_cursor: Optional[Tuple[float, float]] = None
+    cursor = _CursorTarget()
     try:
-        # macOS has one shared cursor; best-effort restore so users can keep using their Mac.
-        pre_cursor: Optional[Tuple[float, float]] = None
-        expected_cursor: Optional[Tuple[float, float]] = None
+        if handler is None:
+            raise ValueError("unsupported action_type: %s" % action_type)
         if cfg.restore_cursor:
             try:
                 pre_cursor = input_mouse.mouse_position()
             except Exception:
                 pre_cursor = None
-
-        if action_type == "click":
-            xy = _box_to_xy(ai.start_box, bounds, factor)
-            if not xy:
-                raise ValueError("missing start_box")
-            expected_cursor = (xy[0], xy[1])
-            input_mouse.mouse_click(xy[0], xy[1], button="left")
-
-        elif action_type in ("left_double", "double_click", "doubleclick", "dblclick"):
-            xy = _box_to_xy(ai.start_box, bounds, factor)
-            if not xy:
-                raise ValueError("missing start_box")
-            expected_cursor = (xy[0], xy[1])
-            interval_ms = ai.interval_ms
-            if interval_ms is None:
-                interval_ms = int(getattr(cfg, "double_click_interval_ms", 50))
-            input_mouse.mouse_double_click(xy[0], xy[1], interval_s=float(interval_ms) / 1000.0)
-
-        elif action_type == "right_single":
-            xy = _box_to_xy(ai.start_box, bounds, factor)
-            if not xy:
-                raise ValueError("missing start_box")
-            expected_cursor = (xy[0], xy[1])
-            input_mouse.mouse_right_click(xy[0], xy[1])
-
-        elif action_type == "drag":
-            sxy = _box_to_xy(ai.start_box, bounds, factor)
-            exy = _box_to_xy(ai.end_box, bounds, factor)
-            if not sxy or not exy:
-                raise ValueError("missing start_box/end_box")
-            expected_cursor = (exy[0], exy[1])
-            # Heuristic: long-distance drags on iPhone are usually swipe gestures (page/back),
-            # where we must avoid a long-press that can start icon drag/rearrange.
-            dist = math.hypot(exy[0] - sxy[0], exy[1] - sxy[1])
-            is_swipe_like = dist >= max(220.0, min(bounds.width, bounds.height) * 0.25)
-            if is_swipe_like:
-                input_mouse.mouse_drag(
-                    sxy[0],
-                    sxy[1],
-                    exy[0],
-                    exy[1],
-                    duration=0.18,
-                    hold_before_move_s=0.004,
-                )
-            else:
-                input_mouse.mouse_drag(
-                    sxy[0],
-                    sxy[1],
-                    exy[0],
-                    exy[1],
-                    duration=0.45,
-                    hold_before_move_s=0.02,
-                )
-
-        elif action_type == "scroll":
-            xy = _box_to_xy(ai.start_box, bounds, factor)
-            if not xy:
-                # UI-TARS-desktop allows scroll(direction=...) without start_box.
-                xy = (bounds.x + bounds.width / 2.0, bounds.y + bounds.height / 2.0)
-            direction = (ai.direction or "").lower().strip()
-            xy = _clamp_xy(xy[0], xy[1], bounds)
-            expected_cursor = (xy[0], xy[1])
-
-            if cfg.scroll_mode == "drag":
-                # iOS-style scroll: use a short swipe gesture inside the window.
-                # For vertical: to scroll down (see more below), swipe up.
-                # For horizontal: match common "direction = swipe direction" expectation.
-                dist = max(80.0, min(bounds.height * 0.35, 520.0))
-                sx, sy = xy
-                if direction == "down":
-                    ex, ey = sx, sy - dist
-                elif direction == "up":
-                    ex, ey = sx, sy + dist
-                elif direction == "left":
-                    ex, ey = sx - dist, sy
-                elif direction == "right":
-                    ex, ey = sx + dist, sy
-                else:
-                    raise ValueError("missing/invalid direction")
-                ex, ey = _clamp_xy(ex, ey, bounds)
-                expected_cursor = (ex, ey)
-                input_mouse.mouse_drag(
-                    sx, sy, ex, ey, duration=0.16, hold_before_move_s=0.004
-                )
-            else:
-                input_mouse.mouse_scroll(
-                    xy[0],
-                    xy[1],
-                    direction=direction,
-                    amount=int(cfg.scroll_amount),
-                    unit=str(cfg.scroll_unit),
-                    repeat=int(cfg.scroll_repeat),
-                    focus_click=bool(cfg.scroll_focus_click),
-                    invert_y=bool(getattr(cfg, "scroll_invert_y", False)),
-                )
-
-        elif action_type == "swipe":
-            # Swipe = rapid burst of scroll-wheel events (simulates trackpad two-finger swipe).
-            # Larger amount + more repeats than normal scroll for a page-level gesture.
-            xy = _box_to_xy(ai.start_box, bounds, factor)
-            if not xy:
-                xy = (bounds.x + bounds.width / 2.0, bounds.y + bounds.height / 2.0)
-            direction = (ai.direction or "").lower().strip()
-            if direction not in ("up", "down", "left", "right"):
-                raise ValueError("missing/invalid direction for swipe")
-            xy = _clamp_xy(xy[0], xy[1], bounds)
-            expected_cursor = (xy[0], xy[1])
-            swipe_amount = 2000 if direction in ("up", "down") else 400
-            input_mouse.mouse_scroll(
-                xy[0], xy[1],
-                direction=direction,
-                amount=swipe_amount,
-                unit="pixel",
-                repeat=15,
-                focus_click=False,
-                invert_y=bool(getattr(cfg, "scroll_invert_y", False)),
-            )
-
-        elif action_type == "hotkey":
-            # Expect "ctrl c" or "cmd shift p" style.
-            key = (ai.key or "").strip().lower()
-            parts = [p for p in key.split(" ") if p]
-            if not parts:
-                raise ValueError("missing key")
-            mods = parts[:-1]
-            k = parts[-1]
-            press(k, modifiers=mods)
-
-        elif action_type == "type":
-            content = ai.content or ""
-            if getattr(cfg, "type_ascii_only", True) and not content.isascii():
-                raise ValueError(
-                    "type(content=...) must be ASCII only. For Chinese, type pinyin (ASCII) "
-                    "via the iPhone IME and select the Chinese candidate via clicks."
-                )
-            if sys.platform == "darwin":
-                # macOS: prefer AppleScript keystroke (matches UI-TARS-desktop behavior).
-                try:
-                    # UI-TARS allows optional start_box for type() (focus first).
-                    if ai.start_box:
-                        xy = _box_to_xy(ai.start_box, bounds, factor)
-                        if xy:
-                            input_mouse.mouse_click(xy[0], xy[1], button="left")
-                            time.sleep(0.05)
-                    type_text_macos_applescript(
-                        app_name=cfg.target_app,
-                        content=content,
-                        mode=cfg.applescript_mode,
-                    )
-                except Exception:
-                    # Fallback: clipboard paste.
-                    press_enter = content.endswith("\n")
-                    if press_enter:
-                        content = content[:-1]
-                    paste_text(content, press_enter=press_enter)
-            else:
-                press_enter = content.endswith("\n")
-                if press_enter:
-                    content = content[:-1]
-                paste_text(content, press_enter=press_enter)
-
-        elif action_type == "sleep":
-            # Fine-grained delays for multi-action sequences (e.g. click + sleep + click).
-            if ai.ms is not None:
-                time.sleep(max(0.0, float(ai.ms) / 1000.0))
-            elif ai.seconds is not None:
-                time.sleep(max(0.0, float(ai.seconds)))
-            else:
-                # Default: short sleep so it remains "fine-grained".
-                time.sleep(0.05)
-
-        elif action_type == "wait":
-            time.sleep(5.0)
-
-        else:
-            raise ValueError("unsupported action_type: %s" % action_type)
-
-        out["ok"] = True
+        handler(cfg, ai, bounds, factor, cursor)
+        out.ok = True
     except Exception as e:
-        out["ok"] = False
-        out["error"] = str(e)
+        out.ok = False
+        out.error = str(e)
     finally:
+        expected_cursor = cursor.xy
         if cfg.restore_cursor and pre_cursor and expected_cursor:
             try:
                 cur = input_mouse.mouse_position()
                 # If the user moved the cursor away while we were executing, don't fight them.
                 # Only restore when the cursor is still near where we expect our action left it.
-                if _dist(cur, expected_cursor) <= 80.0:
+                dx = cur[0] - expected_cursor[0]
+                dy = cur[1] - expected_cursor[1]
+                if dx * dx + dy * dy <= _RESTORE_RADIUS_SQ:
                     input_mouse.mouse_move(pre_cursor[0], pre_cursor[1])
             except Exception:
                 pass
 
-    out["dt"] = time.time() - t0
     return out
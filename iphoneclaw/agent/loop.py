@@ -3,7 +3,8 @@ from __future__ import annotations
 import sys
 import time
 from collections import deque
-from typing import Any, Dict, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 from iphoneclaw.agent.conversation import ConversationStore
 from iphoneclaw.agent.executor import execute_action
@@ -13,14 +14,63 @@ from iphoneclaw.macos.capture import ScreenCapture
 from iphoneclaw.macos.user_input_monitor import UserInputMonitor
 from iphoneclaw.macos.window import WindowFinder
 from iphoneclaw.model.client import OpenAICompatClient, invoke_model
-from iphoneclaw.model.image import data_url_from_jpeg_base64, resize_jpeg_base64, smart_resize
+from iphoneclaw.model.image import data_url_from_jpeg, resize_jpeg, smart_resize
 from iphoneclaw.model.prompt_v15 import system_prompt_v15
 from iphoneclaw.parse.action_parser import parse_predictions
 from iphoneclaw.supervisor.hub import SupervisorHub
 from iphoneclaw.supervisor.state import WorkerControl
 from iphoneclaw.automation.router import L0Router
 from iphoneclaw.automation.action_script import expand_special_predictions
-from iphoneclaw.types import StatusEnum
+from iphoneclaw.types import ActionResult, PredictionParsed, ScreenshotOutput, StatusEnum
+
+
+# Status strings compared on every step (WorkerControl.status_value() returns these).
+_STATUS_RUNNING = StatusEnum.RUNNING.value
+_STATUS_HANG = StatusEnum.HANG.value
+
+
+def _sleep_until(deadline: float) -> None:
+    remaining = deadline - time.monotonic()
+    if remaining > 0:
+        time.sleep(remaining)
+
+
+def _vision_msg_url_string(instruction: str, img_url: str) -> Dict[str, Any]:
+    # Volcengine/Doubao expect "image_url" to be the URL string itself.
+    return {
+        "role": "user",
+        "content": [
+            {"type": "text", "text": instruction},
+            {"type": "image_url", "image_url": img_url},
+        ],
+    }
+
+
+def _vision_msg_url_object(instruction: str, img_url: str) -> Dict[str, Any]:
+    return {
+        "role": "user",
+        "content": [
+            {"type": "text", "text": instruction},
+            {"type": "image_url", "image_url": {"url": img_url}},
+        ],
+    }
+
+
+def _actions_payload(preds: List[PredictionParsed], source: Optional[str] = None) -> List[Dict[str, Any]]:
+    # action.json body.
+    out = [
+        {
+            "action_type": p.action_type,
+            "raw_action": p.raw_action,
+            "thought": p.thought,
+            "inputs": p.action_inputs.to_dict(),
+        }
+        for p in preds
+    ]
+    if source is not None:
+        for d in out:
+            d["source"] = source
+    return out
 
 
 class Worker:
@@ -37,61 +87,94 @@ class Worker:
         self.hub = hub or SupervisorHub()
         self.control = control or WorkerControl()
         self.recorder = recorder or RunRecorder(cfg)
-        self.conversation = conversation or ConversationStore()
+        self.conversation = conversation or ConversationStore(max_items=cfg.conversation_max_items)
 
         self.wf = WindowFinder(app_name=cfg.target_app, window_contains=cfg.window_contains)
-        self.cap = ScreenCapture(self.wf)
+        self.cap = ScreenCapture(self.wf, jpeg_backend=cfg.capture_jpeg_backend)
         self._monitor: Optional[UserInputMonitor] = None
 
-        self.client = OpenAICompatClient(cfg.model_base_url, cfg.model_api_key, cfg.model_name)
+        self.client = OpenAICompatClient(
+            cfg.model_base_url,
+            cfg.model_api_key,
+            cfg.model_name,
+            request_encoding=cfg.model_request_encoding,
+        )
         self.system = system_prompt_v15(cfg.language)
-        self._vision_image_url_as_string = ("volces.com" in cfg.model_base_url.lower()) or (
-            "doubao" in cfg.model_name.lower()
+        # The system prompt is fixed for the run; build its message once and reuse it every step.
+        self._system_msg: Dict[str, Any] = {"role": "system", "content": self.system}
+        self._is_volces = "volces.com" in cfg.model_base_url.lower()
+        self._vision_image_url_as_string = self._is_volces or ("doubao" in cfg.model_name.lower())
+        # Provider-specific message shape is fixed per run; pick the builder once.
+        self._build_vision_msg = (
+            _vision_msg_url_string if self._vision_image_url_as_string else _vision_msg_url_object
+        )
+        # Volcengine thinking switch, sent with every request.
+        self._extra_body: Optional[Dict[str, Any]] = (
+            {"thinking": {"type": cfg.volc_thinking_type}} if self._is_volces else None
         )
         self._sent_type_ascii_guidance = False
 
         # L0 automation: in-run memoization
         self._l0: Optional[L0Router] = None
+        # Post-action capture + fingerprint for a pending L0 record: (future, pre_fp, actions, step).
+        self._l0_pending: Optional[Tuple[Future, int, List[PredictionParsed], int]] = None
         if cfg.automation_enable and cfg.automation_l0_enable:
             self._l0 = L0Router(
                 hash_threshold=cfg.automation_hash_threshold,
                 max_reuse=cfg.automation_max_reuse,
             )
+            self._l0_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="iphoneclaw-l0")
 
     def _publish_conv(self, role: str, text: str) -> None:
         self.hub.publish("conversation", {"role": role, "text": text})
 
-    def _vision_msg(self, instruction: str, image_b64: str) -> Dict[str, Any]:
-        img_url = data_url_from_jpeg_base64(image_b64)
-        if self._vision_image_url_as_string:
-            return {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": instruction},
-                    {"type": "image_url", "image_url": img_url},
-                ],
-            }
-        return {
-            "role": "user",
-            "content": [
-                {"type": "text", "text": instruction},
-                {"type": "image_url", "image_url": {"url": img_url}},
-            ],
-        }
+    def _post_fingerprint(self) -> Optional[int]:
+        shot = self.cap.capture()
+        return self._l0.fingerprint(shot.jpeg)  # type: ignore[union-attr]
+
+    def _finish_l0_record(self) -> None:
+        pending, self._l0_pending = self._l0_pending, None
+        if pending is None or self._l0 is None:
+            return
+        fut, pre_fp, actions, step = pending
+        try:
+            post_fp = fut.result()
+        except Exception:
+            return
+        self._l0.record(pre_fp, actions, post_fp, step)
+
+    def _vision_msg(self, instruction: str, jpeg: bytes) -> Dict[str, Any]:
+        return self._build_vision_msg(instruction, data_url_from_jpeg(jpeg))
 
     def run(self, instruction: str) -> None:
+        try:
+            self._run(instruction)
+        finally:
+            try:
+                # Release the kept-alive model connection instead of waiting for GC.
+                self.client.close()
+                if self._l0 is not None:
+                    # The last step's post-action fingerprint is otherwise only committed at
+                    # the top of a step that never comes.
+                    try:
+                        self._finish_l0_record()
+                    finally:
+                        self._l0_pool.shutdown(wait=False)
+            finally:
+                # Drain background recorder writes so the run directory is complete on return.
+                self.recorder.flush()
+
+    def _run(self, instruction: str) -> None:
         self.control.set_status(StatusEnum.RUNNING)
-        self.hub.set_status(self.control.snapshot()["status"])
+        self.hub.set_status(self.control.status_value())
 
         if getattr(self.cfg, "auto_pause_on_user_input", False):
             def _on_act(a) -> None:
-                snap = self.control.snapshot()
-                if snap.get("paused") or snap.get("stopped"):
+                if self.control.is_paused() or self.control.is_stopped():
                     return
-                if snap.get("status") != StatusEnum.RUNNING.value:
+                if self.control.status_value() != _STATUS_RUNNING:
                     return
                 self.control.pause()
-                snap2 = self.control.snapshot()
                 kind = getattr(a, "kind", "")
                 pos = getattr(a, "pos", None)
                 payload = {"reason": "user_input", "kind": kind, "pos": pos}
@@ -114,7 +197,7 @@ class Worker:
                     pass
 
                 # 3) Publish to SSE.
-                self.hub.set_status(snap2["status"])
+                self.hub.set_status(self.control.status_value())
                 self.hub.publish("auto_pause", payload)
 
             self._monitor = UserInputMonitor(on_activity=_on_act)
@@ -125,7 +208,7 @@ class Worker:
             self.wf.launch_app()
         except Exception as e:
             self.control.set_status(StatusEnum.ERROR)
-            self.hub.set_status(self.control.snapshot()["status"], error=str(e))
+            self.hub.set_status(self.control.status_value(), error=str(e))
             self.hub.publish("error", {"where": "launch_app", "error": str(e)})
             if self._monitor:
                 self._monitor.stop()
@@ -140,24 +223,44 @@ class Worker:
 
         step = 0
         parse_err_streak = 0
-        recent_sigs: "deque[str]" = deque(maxlen=16)
+        # Only the last 8 signatures are ever reported (needs_supervisor payload).
+        recent_sigs: "deque[str]" = deque(maxlen=8)
         repeat_streak = 0
         last_sig = ""
+        # A verified L0 replay already captured the settled screen; the next step reuses it
+        # (with its fingerprint) instead of capturing the same pixels again.
+        carry: Optional[Tuple[ScreenshotOutput, int]] = None
+
+        # Config is fixed for the run; bind what the loop reads every step.
+        cfg = self.cfg
+        max_loops = int(cfg.max_loop_count)
+        interval_s = float(cfg.loop_interval_ms) / 1000.0
+        verbose = cfg.automation_verbose
+        hang_on_finished = cfg.hang_on_finished
+        hang_on_call_user = cfg.hang_on_call_user
+        pause_on_repeat = bool(cfg.auto_pause_on_repeat_action)
+        repeat_threshold = int(cfg.repeat_action_streak_threshold)
+        registry_path = str(cfg.script_registry_path)
+        jpeg_backend = cfg.jpeg_backend
+        max_tokens, temperature, top_p = cfg.max_tokens, cfg.temperature, cfg.top_p
+        extra_body = self._extra_body
+
         while True:
             try:
-                if self.control.snapshot()["stopped"]:
+                if self.control.is_stopped():
                     self.control.set_status(StatusEnum.USER_STOPPED)
-                    self.hub.set_status(self.control.snapshot()["status"])
+                    self.hub.set_status(self.control.status_value())
                     if self._monitor:
                         self._monitor.stop()
                     return
 
-                # Pause / Hang gate at step boundaries
-                while self.control.snapshot()["paused"]:
-                    time.sleep(0.2)
-                    if self.control.snapshot()["stopped"]:
+                # Pause / Hang gate at step boundaries (wakes as soon as resume/stop lands)
+                while self.control.is_paused():
+                    carry = None  # the screen may change while paused
+                    self.control.wait_unpaused(1.0)
+                    if self.control.is_stopped():
                         self.control.set_status(StatusEnum.USER_STOPPED)
-                        self.hub.set_status(self.control.snapshot()["status"])
+                        self.hub.set_status(self.control.status_value())
                         if self._monitor:
                             self._monitor.stop()
                         return
@@ -170,20 +273,28 @@ class Worker:
                     self._publish_conv("user", txt)
 
                 step += 1
-                if step > int(self.cfg.max_loop_count):
+                if step > max_loops:
                     self.control.set_status(StatusEnum.ERROR)
-                    self.hub.set_status(self.control.snapshot()["status"], error="max_loop_count")
+                    self.hub.set_status(self.control.status_value(), error="max_loop_count")
                     if self._monitor:
                         self._monitor.stop()
                     return
 
-                shot = self.cap.capture()
+                # Commit last step's L0 record; its capture must not overlap the one below.
+                if self._l0_pending is not None:
+                    self._finish_l0_record()
+
+                pre_fp: Optional[int] = None
+                if carry is not None:
+                    (shot, pre_fp), carry = carry, None
+                else:
+                    shot = self.cap.capture()
                 self.recorder.write_step(step, screenshot=shot)
 
                 # ---- L0 automation: in-run memoization ----
-                pre_fp: Optional[int] = None
                 if self._l0 is not None:
-                    pre_fp = self._l0.fingerprint(shot.base64)
+                    if pre_fp is None:
+                        pre_fp = self._l0.fingerprint(shot.jpeg)
                     l0_entry = self._l0.try_cache(pre_fp, step)
                     if l0_entry is not None:
                         self.recorder.log_event("automation_hit", {
@@ -194,7 +305,7 @@ class Worker:
                         })
 
                         cached_action_strs = [p.raw_action for p in l0_entry.actions]
-                        if self.cfg.automation_verbose:
+                        if verbose:
                             print(
                                 f"[iphoneclaw] L0 cache HIT step={step} "
                                 f"hit#{l0_entry.hit_count + 1} "
@@ -209,31 +320,23 @@ class Worker:
                         ) % (l0_entry.hit_count + 1, "; ".join(cached_action_strs))
                         self.recorder.write_step(step, raw_model_text=synthetic_text)
 
-                        l0_actions_payload: List[Dict[str, Any]] = []
-                        for p in l0_entry.actions:
-                            l0_actions_payload.append({
-                                "action_type": p.action_type,
-                                "raw_action": p.raw_action,
-                                "thought": p.thought,
-                                "inputs": p.action_inputs.__dict__,
-                                "source": "l0_cache",
-                            })
                         self.recorder.write_step(
-                            step, action={"actions": l0_actions_payload, "source": "l0_cache"},
+                            step,
+                            action={"actions": _actions_payload(l0_entry.actions, "l0_cache"), "source": "l0_cache"},
                         )
 
                         l0_exec_ok = True
-                        l0_exec_results: List[Dict[str, Any]] = []
+                        l0_exec_results: List[ActionResult] = []
                         for pred in l0_entry.actions:
                             if pred.action_type in ("finished", "call_user", "error_env"):
                                 l0_exec_ok = False
                                 break
                             self.wf.activate_app()
-                            res = execute_action(self.cfg, pred, shot)
-                            self.recorder.log_event("exec", res)
+                            res = execute_action(cfg, pred, shot)
+                            self.recorder.log_event("exec", res.to_dict())
                             l0_exec_results.append(res)
 
-                            sig = f"{pred.action_type}|{(pred.raw_action or '').strip()}"
+                            sig = pred.signature()
                             recent_sigs.append(sig)
                             if sig == last_sig:
                                 repeat_streak += 1
@@ -241,15 +344,16 @@ class Worker:
                                 repeat_streak = 1
                                 last_sig = sig
 
-                            if not res.get("ok"):
+                            if not res.ok:
                                 l0_exec_ok = False
                                 break
+                        settle_deadline = time.monotonic() + interval_s
 
                         if l0_exec_ok:
-                            time.sleep(float(self.cfg.loop_interval_ms) / 1000.0)
+                            _sleep_until(settle_deadline)
                             try:
                                 verify_shot = self.cap.capture()
-                                post_fp = self._l0.fingerprint(verify_shot.base64)
+                                post_fp = self._l0.fingerprint(verify_shot.jpeg)
                             except Exception:
                                 post_fp = None
                             verified = self._l0.verify_and_commit(
@@ -264,34 +368,36 @@ class Worker:
                         if l0_exec_results:
                             if len(l0_exec_results) == 1:
                                 self.recorder.write_step(
-                                    step, exec_result=l0_exec_results[0],
+                                    step, exec_result=l0_exec_results[0].to_dict(),
                                 )
                             else:
                                 self.recorder.write_step(
                                     step,
-                                    exec_result={"exec_results": l0_exec_results},
+                                    exec_result={"exec_results": [r.to_dict() for r in l0_exec_results]},
                                 )
 
                         if verified:
                             self.recorder.log_event(
                                 "automation_verify_ok", {"step": step},
                             )
-                            if self.cfg.automation_verbose:
+                            if verbose:
                                 print(
                                     f"[iphoneclaw] L0 verify OK step={step} "
                                     f"(VLM call skipped)",
                                     file=sys.stderr, flush=True,
                                 )
+                            if post_fp is not None:
+                                carry = (verify_shot, post_fp)
                             self.control.set_status(StatusEnum.RUNNING)
                             self.hub.set_status(
-                                self.control.snapshot()["status"], step=step,
+                                self.control.status_value(), step=step,
                             )
                             continue
 
                         self.recorder.log_event("automation_verify_fail", {
                             "step": step, "exec_ok": l0_exec_ok,
                         })
-                        if self.cfg.automation_verbose:
+                        if verbose:
                             print(
                                 f"[iphoneclaw] L0 verify FAIL step={step} "
                                 f"exec_ok={l0_exec_ok}, falling back to VLM",
@@ -308,28 +414,27 @@ class Worker:
                         })
                 # ---- End L0 automation ----
 
-                # Resize image to match pixel budget before sending to model.
-                send_b64 = shot.base64
+                # Resize image to match pixel budget before sending to model. Work on the raw
+                # JPEG; it is base64-encoded exactly once, directly into the data URL.
+                send_jpeg = shot.jpeg
                 tw, th = smart_resize(int(shot.image_width), int(shot.image_height))
                 if tw and th and (tw != shot.image_width or th != shot.image_height):
-                    send_b64 = resize_jpeg_base64(shot.base64, tw, th)
+                    send_jpeg = resize_jpeg(send_jpeg, tw, th, backend=jpeg_backend)
 
                 # Build messages
-                messages: List[Dict[str, Any]] = [{"role": "system", "content": self.system}]
                 tail = self.conversation.to_openai_messages(include_system=False, tail_rounds=8)
-                messages.extend(tail)
-                messages.append(self._vision_msg("Current screen. Decide next action.", send_b64))
-
-                extra_body = None
-                if "volces.com" in self.cfg.model_base_url.lower():
-                    extra_body = {"thinking": {"type": self.cfg.volc_thinking_type}}
+                messages: List[Dict[str, Any]] = [
+                    self._system_msg,
+                    *tail,
+                    self._vision_msg("Current screen. Decide next action.", send_jpeg),
+                ]
 
                 inv = invoke_model(
                     self.client,
                     messages,
-                    max_tokens=self.cfg.max_tokens,
-                    temperature=self.cfg.temperature,
-                    top_p=self.cfg.top_p,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    top_p=top_p,
                     parse_fn=parse_predictions,
                     extra_body=extra_body,
                 )
@@ -348,20 +453,14 @@ class Worker:
                 preds = inv.parsed_predictions
                 # Record all actions for this step in action.json so supervisors can debug
                 # multi-action sequences (double-click, click+sleep+click, etc).
-                actions_payload: List[Dict[str, Any]] = []
-                for p in preds:
-                    actions_payload.append(
-                        {
-                            "action_type": p.action_type,
-                            "raw_action": p.raw_action,
-                            "thought": p.thought,
-                            "inputs": p.action_inputs.__dict__,
-                        }
-                    )
-                self.recorder.write_step(step, action={"actions": actions_payload})
+                self.recorder.write_step(step, action={"actions": _actions_payload(preds)})
 
                 # If all parsed actions are parse errors, treat as a parse error step.
-                non_err = [p for p in preds if p.action_type != "error_env"]
+                # Typical steps contain no error_env entries, so reuse `preds` without copying.
+                if any(p.action_type == "error_env" for p in preds):
+                    non_err = [p for p in preds if p.action_type != "error_env"]
+                else:
+                    non_err = preds
                 if not non_err:
                     parse_err_streak += 1
                     raw0 = preds[0].raw_action if preds else ""
@@ -369,65 +468,63 @@ class Worker:
                     if parse_err_streak >= 3:
                         self.control.set_status(StatusEnum.HANG)
                         self.control.pause()
-                        self.hub.set_status(self.control.snapshot()["status"], reason="parse_error_streak")
+                        self.hub.set_status(self.control.status_value(), reason="parse_error_streak")
                         self.hub.publish("hang", {"reason": "parse_error_streak"})
                     continue
                 parse_err_streak = 0
 
                 # Execute each action sequentially (same screenshot mapping) until a terminal/hang.
-                exec_results: List[Dict[str, Any]] = []
+                exec_results: List[ActionResult] = []
                 # Expand run_script(...) into concrete actions before execution and caching.
                 try:
-                    non_err = expand_special_predictions(
-                        non_err, registry_path=str(getattr(self.cfg, "script_registry_path", "./action_scripts/registry.json"))
-                    )
+                    non_err = expand_special_predictions(non_err, registry_path=registry_path)
                 except Exception as e:
                     payload = {"reason": "run_script_error", "error": str(e), "step": step}
                     self.recorder.log_event("needs_supervisor", payload)
                     self.hub.publish("error", {"where": "run_script", **payload})
                     self.control.set_status(StatusEnum.HANG)
                     self.control.pause()
-                    self.hub.set_status(self.control.snapshot()["status"], **payload)
+                    self.hub.set_status(self.control.status_value(), extra=payload)
                     self.hub.publish("hang", payload)
                     continue
 
                 for pred in non_err:
                     # Terminal actions with hang semantics
                     if pred.action_type == "finished":
-                        if self.cfg.hang_on_finished:
+                        if hang_on_finished:
                             self.control.set_status(StatusEnum.HANG)
                             self.control.pause()
-                            self.hub.set_status(self.control.snapshot()["status"])
+                            self.hub.set_status(self.control.status_value())
                             self.hub.publish("hang", {"reason": "finished"})
                             break
                         self.control.set_status(StatusEnum.END)
-                        self.hub.set_status(self.control.snapshot()["status"])
+                        self.hub.set_status(self.control.status_value())
                         if self._monitor:
                             self._monitor.stop()
                         return
 
                     if pred.action_type == "call_user":
-                        if self.cfg.hang_on_call_user:
+                        if hang_on_call_user:
                             self.control.set_status(StatusEnum.HANG)
                             self.control.pause()
-                            self.hub.set_status(self.control.snapshot()["status"])
+                            self.hub.set_status(self.control.status_value())
                             self.hub.publish("hang", {"reason": "call_user"})
                             break
                         self.control.set_status(StatusEnum.CALL_USER)
-                        self.hub.set_status(self.control.snapshot()["status"])
+                        self.hub.set_status(self.control.status_value())
                         if self._monitor:
                             self._monitor.stop()
                         return
 
                     self.wf.activate_app()
-                    res = execute_action(self.cfg, pred, shot)
-                    self.recorder.log_event("exec", res)
+                    res = execute_action(cfg, pred, shot)
+                    self.recorder.log_event("exec", res.to_dict())
                     exec_results.append(res)
 
                     # Repeated-action loop detection: trigger only after we actually executed the action.
                     # This avoids blocking actions that are legitimately needed multiple times (e.g. scroll
                     # a few times to load more comments) while still pausing true dead-loops.
-                    sig = f"{pred.action_type}|{(pred.raw_action or '').strip()}"
+                    sig = pred.signature()
                     recent_sigs.append(sig)
                     if sig == last_sig:
                         repeat_streak += 1
@@ -435,15 +532,15 @@ class Worker:
                         repeat_streak = 1
                         last_sig = sig
                     if (
-                        getattr(self.cfg, "auto_pause_on_repeat_action", True)
-                        and repeat_streak >= int(getattr(self.cfg, "repeat_action_streak_threshold", 4))
+                        pause_on_repeat
+                        and repeat_streak >= repeat_threshold
                         and pred.action_type not in ("finished", "call_user")
                     ):
                         payload = {
                             "reason": "repeat_action_streak",
                             "streak": repeat_streak,
                             "signature": sig,
-                            "recent": list(recent_sigs)[-8:],
+                            "recent": list(recent_sigs),
                             "step": step,
                             "run_id": getattr(self.recorder, "run_id", ""),
                         }
@@ -463,13 +560,12 @@ class Worker:
                             pass
                         self.control.set_status(StatusEnum.HANG)
                         self.control.pause()
-                        # NOTE: payload already contains "reason"; do not pass duplicate kwargs.
-                        self.hub.set_status(self.control.snapshot()["status"], **payload)
+                        self.hub.set_status(self.control.status_value(), extra=payload)
                         self.hub.publish("needs_supervisor", payload)
                         break
 
-                    if not res.get("ok"):
-                        err = str(res.get("error") or "")
+                    if not res.ok:
+                        err = res.error or ""
                         self.hub.publish("error", {"where": "exec", "error": err, "step": step})
 
                         # If we blocked non-ASCII typing, guide the model to use IME (pinyin) instead.
@@ -486,37 +582,41 @@ class Worker:
                             self.recorder.log_conversation("user", txt, injected=True)
                             self._publish_conv("user", txt)
 
+                # loop_interval_ms is a settle delay after the last action; bookkeeping below counts toward it.
+                settle_deadline = time.monotonic() + interval_s
+
                 # If we were paused/hanging mid-step, skip status reset and loop delay.
-                if self.control.snapshot().get("paused") or self.control.snapshot().get("status") == StatusEnum.HANG.value:
-                    self.hub.set_status(self.control.snapshot()["status"], step=step)
+                if self.control.is_paused() or self.control.status_value() == _STATUS_HANG:
+                    self.hub.set_status(self.control.status_value(), step=step)
                     continue
 
                 # Persist exec results for this step (single or multi-action).
                 if exec_results:
                     if len(exec_results) == 1:
-                        self.recorder.write_step(step, exec_result=exec_results[0])
+                        self.recorder.write_step(step, exec_result=exec_results[0].to_dict())
                     else:
-                        self.recorder.write_step(step, exec_result={"exec_results": exec_results})
+                        self.recorder.write_step(
+                            step, exec_result={"exec_results": [r.to_dict() for r in exec_results]}
+                        )
 
                 # Store in L0 cache after successful VLM execution.
                 if self._l0 is not None and pre_fp is not None and exec_results:
-                    all_ok = all(r.get("ok") for r in exec_results)
+                    all_ok = all(r.ok for r in exec_results)
                     if all_ok and self._l0.should_cache_actions(non_err):
-                        try:
-                            post_shot = self.cap.capture()
-                            post_fp = self._l0.fingerprint(post_shot.base64)
-                            self._l0.record(pre_fp, list(non_err), post_fp, step)
-                        except Exception:
-                            pass
+                        # Capture + fingerprint the post-action screen in the background so it
+                        # overlaps the settle delay; committed at the top of the next step.
+                        self._l0_pending = (
+                            self._l0_pool.submit(self._post_fingerprint), pre_fp, list(non_err), step,
+                        )
 
                 # Update status each loop
                 self.control.set_status(StatusEnum.RUNNING)
-                self.hub.set_status(self.control.snapshot()["status"], step=step)
+                self.hub.set_status(self.control.status_value(), step=step)
 
-                time.sleep(float(self.cfg.loop_interval_ms) / 1000.0)
+                _sleep_until(settle_deadline)
             except Exception as e:
                 self.control.set_status(StatusEnum.ERROR)
-                self.hub.set_status(self.control.snapshot()["status"], error=str(e), step=step)
+                self.hub.set_status(self.control.status_value(), error=str(e), step=step)
                 self.hub.publish("error", {"where": "loop", "error": str(e), "step": step})
                 self.recorder.log_event("error", {"error": str(e), "step": step})
                 if self._monitor:
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
-import base64
 import json
+import logging
 import os
+import queue
+import threading
 import time
 from dataclasses import asdict
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from iphoneclaw.config import Config
+from iphoneclaw.jsonutil import dumps_bytes
 from iphoneclaw.types import ScreenshotOutput
 
+logger = logging.getLogger(__name__)
+
 
 def _redact_config(cfg: Config) -> Dict[str, Any]:
     d = asdict(cfg)
@@ -26,9 +31,99 @@ def _json_dump(path: str, obj: Any) -> None:
         json.dump(obj, f, ensure_ascii=False, indent=2)
 
 
-def _jsonl_append(path: str, obj: Any) -> None:
-    with open(path, "a", encoding="utf-8") as f:
-        f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+def _replace_file(path: str, data: bytes) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _append_file(path: str, data: bytes) -> None:
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+def _json_file_bytes(obj: Any) -> bytes:
+    # Same bytes _json_dump would write.
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+class _FileWriter:
+    """
+    Writes run files on a background thread.
+
+    append() adds a JSONL record; write() replaces a whole file (step files) via a temp file
+    and os.replace, so readers never see a partial file. A given path is only ever used with
+    one of the two. Payloads are serialized on the caller's thread (so later mutation cannot
+    leak into the log) and written in batches, one open/write per JSONL file per batch.
+    A failed write is logged and does not affect the rest of the batch; the first such error
+    is re-raised on the next append()/write()/flush().
+    """
+
+    _BATCH = 32
+
+    def __init__(self) -> None:
+        # (path, data, whole_file)
+        self._q: "queue.Queue[Tuple[str, bytes, bool]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+    def append(self, path: str, obj: Any) -> None:
+        self._put(path, dumps_bytes(obj) + b"\n", False)
+
+    def write(self, path: str, data: bytes) -> None:
+        self._put(path, data, True)
+
+    def _put(self, path: str, data: bytes, whole_file: bool) -> None:
+        self._raise_pending()
+        self._q.put((path, data, whole_file))
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    t = threading.Thread(target=self._drain, name="iphoneclaw-rec", daemon=True)
+                    t.start()
+                    self._thread = t
+
+    def flush(self) -> None:
+        """Block until every queued record/file has been written."""
+        self._q.join()
+        self._raise_pending()
+
+    def _raise_pending(self) -> None:
+        err = self._error
+        if err is not None:
+            self._error = None
+            raise err
+
+    def _drain(self) -> None:
+        while True:
+            batch = [self._q.get()]
+            try:
+                while len(batch) < self._BATCH:
+                    batch.append(self._q.get_nowait())
+            except queue.Empty:
+                pass
+            try:
+                by_path: Dict[str, List[bytes]] = {}
+                for path, data, whole_file in batch:
+                    if whole_file:
+                        self._attempt(_replace_file, path, data)
+                    else:
+                        by_path.setdefault(path, []).append(data)
+                for path, lines in by_path.items():
+                    self._attempt(_append_file, path, b"".join(lines))
+            finally:
+                for _ in batch:
+                    self._q.task_done()
+
+    def _attempt(self, fn: Callable[[str, bytes], None], path: str, data: bytes) -> None:
+        try:
+            fn(path, data)
+        except Exception as e:
+            logger.warning("recorder write failed: %s: %s", path, e)
+            if self._error is None:
+                self._error = e
 
 
 class RunRecorder:
@@ -50,18 +145,24 @@ class RunRecorder:
 
         self.conversation_path = os.path.join(self.root, "conversation.jsonl")
         self.events_path = os.path.join(self.root, "events.jsonl")
+        self._writer = _FileWriter()
+        self._step_dirs: Set[str] = set()
 
     def log_conversation(self, role: str, text: str, **meta: Any) -> None:
-        _jsonl_append(
+        self._writer.append(
             self.conversation_path,
             {"role": role, "text": text, "ts": time.time(), "meta": meta},
         )
 
     def log_event(self, type_: str, data: Dict[str, Any]) -> None:
-        _jsonl_append(
+        self._writer.append(
             self.events_path, {"type": type_, "data": data, "ts": time.time()}
         )
 
+    def flush(self) -> None:
+        """Wait for queued step files and conversation/event lines to reach disk."""
+        self._writer.flush()
+
     def write_step(
         self,
         step: int,
@@ -72,15 +173,16 @@ class RunRecorder:
         exec_result: Optional[Dict[str, Any]] = None,
     ) -> str:
         d = os.path.join(self.steps_dir, "%04d" % step)
-        os.makedirs(d, exist_ok=True)
+        if d not in self._step_dirs:
+            os.makedirs(d, exist_ok=True)
+            self._step_dirs.add(d)
 
+        # Files are queued for the background writer; call flush() before reading them back.
         if screenshot is not None:
-            jpg = base64.b64decode(screenshot.base64)
-            with open(os.path.join(d, "screenshot.jpg"), "wb") as f:
-                f.write(jpg)
-            _json_dump(
+            self._writer.write(os.path.join(d, "screenshot.jpg"), screenshot.jpeg)
+            self._writer.write(
                 os.path.join(d, "screenshot.json"),
-                {
+                _json_file_bytes({
                     "scale_factor": screenshot.scale_factor,
                     "window_bounds": asdict(screenshot.window_bounds),
                     "image_width": screenshot.image_width,
@@ -88,18 +190,17 @@ class RunRecorder:
                     "raw_image_width": screenshot.raw_image_width,
                     "raw_image_height": screenshot.raw_image_height,
                     "crop_rect_px": screenshot.crop_rect_px,
-                },
+                }),
             )
 
         if raw_model_text is not None:
-            with open(os.path.join(d, "model.txt"), "w", encoding="utf-8") as f:
-                f.write(raw_model_text)
+            self._writer.write(os.path.join(d, "model.txt"), raw_model_text.encode("utf-8"))
 
         if action is not None:
-            _json_dump(os.path.join(d, "action.json"), action)
+            self._writer.write(os.path.join(d, "action.json"), _json_file_bytes(action))
 
         if exec_result is not None:
-            _json_dump(os.path.join(d, "exec.json"), exec_result)
+            self._writer.write(os.path.join(d, "exec.json"), _json_file_bytes(exec_result))
 
         return d
 
@@ -115,5 +216,21 @@ class RunRecorder:
         except Exception:
             return None
 
+    def latest_screenshot(self) -> Optional[Tuple[int, str]]:
+        """
+        (step, path) of the newest step whose screenshot.jpg is on disk. Step files are
+        written in the background, so the newest step directory may not have it yet.
+        """
+        try:
+            names = os.listdir(self.steps_dir)
+            steps = sorted((int(n) for n in names if n.isdigit()), reverse=True)
+        except Exception:
+            return None
+        for step in steps:
+            path = os.path.join(self.step_dir(step), "screenshot.jpg")
+            if os.path.exists(path):
+                return step, path
+        return None
+
     def step_dir(self, step: int) -> str:
         return os.path.join(self.steps_dir, "%04d" % int(step))
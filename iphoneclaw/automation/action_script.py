@@ -5,9 +5,11 @@ import os
 import re
 import shlex
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional, Tuple
+from functools import lru_cache
+from json.encoder import encode_basestring_ascii
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
 
-from iphoneclaw.parse.action_parser import parse_predictions
+from iphoneclaw.parse.action_parser import parse_single_action
 from iphoneclaw.types import PredictionParsed
 from iphoneclaw.automation.script_registry import resolve_script_path, ScriptRegistryError
 
@@ -16,9 +18,22 @@ class ScriptParseError(ValueError):
     pass
 
 
-_TOP_SPLIT_CHARS = {"\n", ";", ","}
-_WS_RE = re.compile(r"\s+")
+_TOP_SCAN_RE = re.compile(r"[\"'()\n;,]")
+_PAREN_SCAN_RE = re.compile(r"[\"'()]")
 _TEMPLATE_RE = re.compile(r"\$\{([A-Z0-9_]+)\}")
+# Raw action calls: "click(...)" / "sleep(ms=50)" / etc., or a bare action token (group 1).
+# Bare tokens are a small whitelist to avoid interpreting DSL keywords like "sleep" or
+# "swipe" as raw action calls.
+_ACTION_CALL_RE = re.compile(
+    r"[A-Za-z_]\w*\(.*\)$|(iphone_home|iphone_app_switcher|wait|finished|call_user)\Z"
+)
+_INT_RE = re.compile(r"\d+\Z")
+_TYPE_ESCAPE_RE = re.compile(r"(\\+)([nrt\"']?)")
+_TYPE_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", '"': '"', "'": "'"}
+# One DSL token: unquoted runs and '...'/"..." strings glued together, as shlex joins
+# them. A stray quote or backslash matches the second branch (empty group).
+_DSL_TOK_RE = re.compile(r"""((?:[^ \t\r\n'"\\]+|'[^']*'|"[^"\\]*")+)|['"\\]""")
+_DSL_QUOTED_RE = re.compile(r"'([^']*)'|\"([^\"]*)\"")
 
 
 def render_template(text: str, vars: Optional[Dict[str, str]] = None) -> str:
@@ -26,17 +41,19 @@ def render_template(text: str, vars: Optional[Dict[str, str]] = None) -> str:
     Very small templating: replaces ${VARNAME} with vars[VARNAME] or os.environ[VARNAME].
     Unknown vars are left as-is so scripts remain editable.
     """
+    if not text or "${" not in text:
+        return text or ""
     vars = vars or {}
+    get_env = os.environ.get
 
     def repl(m: re.Match[str]) -> str:
         k = m.group(1)
         if k in vars:
             return str(vars[k])
-        if k in os.environ:
-            return str(os.environ[k])
-        return m.group(0)
+        v = get_env(k)
+        return m.group(0) if v is None else v
 
-    return _TEMPLATE_RE.sub(repl, text or "")
+    return _TEMPLATE_RE.sub(repl, text)
 
 
 def _split_top_level(text: str) -> List[str]:
@@ -47,71 +64,58 @@ def _split_top_level(text: str) -> List[str]:
     if not s:
         return []
 
+    # Jump between quote/paren/separator characters instead of visiting every char;
+    # a quoted run is skipped in one find() for its closing quote.
     out: List[str] = []
-    buf: List[str] = []
-    quote: Optional[str] = None
     depth = 0
-
-    def flush() -> None:
-        part = "".join(buf).strip()
-        buf.clear()
-        if part:
-            out.append(part)
-
-    for ch in s:
-        if quote is not None:
-            buf.append(ch)
-            if ch == quote:
-                quote = None
-            continue
-        if ch in ("'", '"'):
-            quote = ch
-            buf.append(ch)
-            continue
-        if ch == "(":
+    start = 0
+    pos = 0
+    search = _TOP_SCAN_RE.search
+    while True:
+        m = search(s, pos)
+        if m is None:
+            break
+        i = m.start()
+        ch = s[i]
+        pos = i + 1
+        if ch == "'" or ch == '"':
+            j = s.find(ch, pos)
+            if j < 0:
+                break
+            pos = j + 1
+        elif ch == "(":
             depth += 1
-            buf.append(ch)
-            continue
-        if ch == ")":
-            depth = max(0, depth - 1)
-            buf.append(ch)
-            continue
-        if depth == 0 and ch in _TOP_SPLIT_CHARS:
-            flush()
-            continue
-        buf.append(ch)
-    flush()
+        elif ch == ")":
+            if depth:
+                depth -= 1
+        elif depth == 0:
+            part = s[start:i].strip()
+            if part:
+                out.append(part)
+            start = pos
+    part = s[start:].strip()
+    if part:
+        out.append(part)
     return out
 
 
-_KNOWN_KEYWORDS = (
-    "iphone_home",
-    "iphone_app_switcher",
-    "sleep",
-    "wait",
-    "swipe",
-    "fswipe",
-    "scroll",
-    "hotkey",
-    "type",
-    "open_app",
-    "include",
-    "run_script",
+_KNOWN_KEYWORDS = frozenset(
+    {
+        "iphone_home",
+        "iphone_app_switcher",
+        "sleep",
+        "wait",
+        "swipe",
+        "fswipe",
+        "scroll",
+        "hotkey",
+        "type",
+        "open_app",
+        "include",
+        "run_script",
+    }
 )
-
-
-def _looks_like_action_call(stmt: str) -> bool:
-    s = (stmt or "").strip()
-    if not s:
-        return False
-    # "click(...)" / "sleep(ms=50)" / etc.
-    if re.match(r"^[A-Za-z_]\w*\(.*\)$", s):
-        return True
-    # Bare action tokens: only allow a small whitelist to avoid interpreting DSL keywords
-    # like "sleep" or "swipe" as raw action calls.
-    if re.fullmatch(r"(iphone_home|iphone_app_switcher|wait|finished|call_user)\b", s):
-        return True
-    return False
+_DIRECTIONS = frozenset({"up", "down", "left", "right"})
 
 
 def _split_compound_no_parens(stmt: str) -> List[str]:
@@ -119,24 +123,22 @@ def _split_compound_no_parens(stmt: str) -> List[str]:
     Best-effort split for "iphone_home() sleep swipe left x 10 swipe down"
     when there are no parentheses. We split at keyword boundaries.
     """
-    s = _WS_RE.sub(" ", (stmt or "").strip())
-    if not s:
+    toks = (stmt or "").split()
+    if not toks:
         return []
-    parts = s.split(" ")
+    # Normalize whitespace once, then cut spans by offset instead of re-joining per part.
+    s = " ".join(toks)
 
     out: List[str] = []
-    cur: List[str] = []
-    for tok in parts:
-        low = tok.lower()
-        is_kw = low in _KNOWN_KEYWORDS
-        if is_kw and cur:
-            out.append(" ".join(cur).strip())
-            cur = [tok]
-        else:
-            cur.append(tok)
-    if cur:
-        out.append(" ".join(cur).strip())
-    return [x for x in out if x]
+    start = 0
+    col = len(toks[0]) + 1
+    for tok in toks[1:]:
+        if tok.lower() in _KNOWN_KEYWORDS:
+            out.append(s[start : col - 1])
+            start = col
+        col += len(tok) + 1
+    out.append(s[start:])
+    return out
 
 
 def _explode_function_prefix(stmt: str) -> List[str]:
@@ -151,21 +153,26 @@ def _explode_function_prefix(stmt: str) -> List[str]:
         return [s]
 
     # Find a top-level close-paren for a leading call.
-    quote: Optional[str] = None
     depth = 0
-    for i, ch in enumerate(s):
-        if quote is not None:
-            if ch == quote:
-                quote = None
-            continue
-        if ch in ("'", '"'):
-            quote = ch
-            continue
-        if ch == "(":
+    pos = 0
+    search = _PAREN_SCAN_RE.search
+    while True:
+        m = search(s, pos)
+        if m is None:
+            break
+        i = m.start()
+        ch = s[i]
+        pos = i + 1
+        if ch == "'" or ch == '"':
+            j = s.find(ch, pos)
+            if j < 0:
+                break
+            pos = j + 1
+        elif ch == "(":
             depth += 1
-            continue
-        if ch == ")":
-            depth = max(0, depth - 1)
+        else:
+            if depth:
+                depth -= 1
             if depth == 0:
                 head = s[: i + 1].strip()
                 tail = s[i + 1 :].strip()
@@ -175,6 +182,28 @@ def _explode_function_prefix(stmt: str) -> List[str]:
     return [s]
 
 
+def _dsl_split(s: str) -> List[str]:
+    """
+    shlex.split(s, posix=True) for statements without backslash escapes (the common
+    case), done with one regex pass. Anything else goes through shlex itself.
+    """
+    toks = _DSL_TOK_RE.findall(s)
+    if "" in toks:
+        # Backslash or unterminated quote: defer to shlex for exact semantics.
+        try:
+            return shlex.split(s, posix=True)
+        except Exception:
+            return s.split()
+    if "'" in s or '"' in s:
+        return [_DSL_QUOTED_RE.sub(_unquote, t) for t in toks]
+    return toks
+
+
+def _unquote(m: re.Match[str]) -> str:
+    q = m.group(1)
+    return m.group(2) if q is None else q
+
+
 def _parse_sleep_tokens(args: List[str]) -> str:
     if not args:
         return "sleep(ms=50)"
@@ -186,7 +215,7 @@ def _parse_sleep_tokens(args: List[str]) -> str:
         n = a0[:-1].strip()
         return f"sleep(seconds={float(n)})"
     # Heuristic: integer -> ms, float -> seconds.
-    if re.fullmatch(r"\d+", a0):
+    if _INT_RE.match(a0):
         return f"sleep(ms={int(a0)})"
     return f"sleep(seconds={float(a0)})"
 
@@ -194,7 +223,8 @@ def _parse_sleep_tokens(args: List[str]) -> str:
 def _quote_py_string(s: str) -> str:
     # Use JSON to produce a safe quoted string; parse_predictions() accepts Python AST,
     # and JSON string literals are also valid Python string literals for simple escapes.
-    return json.dumps(s)
+    # This is the quoter json.dumps(s) ends up in, without its per-call encoder dispatch.
+    return encode_basestring_ascii(s)
 
 
 def _unescape_type_content(s: str) -> str:
@@ -204,13 +234,19 @@ def _unescape_type_content(s: str) -> str:
     This keeps scripts writable in plain text while still generating valid
     type(content="...") calls for parse_predictions().
     """
-    if not s:
-        return ""
-    # Order matters: unescape backslash last.
-    s = s.replace("\\r", "\r").replace("\\n", "\n").replace("\\t", "\t")
-    s = s.replace("\\\"", "\"").replace("\\'", "'")
-    s = s.replace("\\\\", "\\")
-    return s
+    if not s or "\\" not in s:
+        return s or ""
+    return _TYPE_ESCAPE_RE.sub(_unescape_run, s)
+
+
+def _unescape_run(m: re.Match[str]) -> str:
+    # Same result as the historical replace() chain (\r \n \t, then quotes, then
+    # backslash last): the final backslash of a run escapes a following n/r/t/quote,
+    # and the rest of the run collapses pairwise.
+    run, ch = m.group(1), m.group(2)
+    if ch:
+        return "\\" * (len(run) // 2) + _TYPE_ESCAPES[ch]
+    return "\\" * ((len(run) + 1) // 2)
 
 
 def _parse_vars_tokens(tokens: List[str]) -> Dict[str, str]:
@@ -250,6 +286,107 @@ def _macro_open_app(ctx: ScriptContext, name: str) -> List[str]:
     ]
 
 
+# DSL command handlers: (ctx, cmd, args after the command and "x N" suffix, raw text
+# after the command word) -> action calls. Dispatched by _CMD_DISPATCH below.
+_CmdHandler = Callable[[ScriptContext, str, List[str], str], List[str]]
+
+
+def _cmd_home(ctx: ScriptContext, cmd: str, rest: List[str], tail: str) -> List[str]:
+    return ["iphone_home()"]
+
+
+def _cmd_app_switcher(ctx: ScriptContext, cmd: str, rest: List[str], tail: str) -> List[str]:
+    return ["iphone_app_switcher()"]
+
+
+def _cmd_sleep(ctx: ScriptContext, cmd: str, rest: List[str], tail: str) -> List[str]:
+    return [_parse_sleep_tokens(rest)]
+
+
+def _cmd_wait(ctx: ScriptContext, cmd: str, rest: List[str], tail: str) -> List[str]:
+    return ["wait()"]
+
+
+def _cmd_swipe(ctx: ScriptContext, cmd: str, rest: List[str], tail: str) -> List[str]:
+    if not rest:
+        raise ScriptParseError("swipe requires a direction: up|down|left|right")
+    d = rest[0].lower().strip()
+    if d not in _DIRECTIONS:
+        raise ScriptParseError("swipe direction must be up|down|left|right")
+    return [f"swipe(direction={_quote_py_string(d)})"]
+
+
+def _cmd_scroll(ctx: ScriptContext, cmd: str, rest: List[str], tail: str) -> List[str]:
+    if not rest:
+        raise ScriptParseError("scroll requires a direction: up|down|left|right")
+    d = rest[0].lower().strip()
+    if d not in _DIRECTIONS:
+        raise ScriptParseError("scroll direction must be up|down|left|right")
+    return [f"scroll(direction={_quote_py_string(d)})"]
+
+
+def _cmd_hotkey(ctx: ScriptContext, cmd: str, rest: List[str], tail: str) -> List[str]:
+    if not rest:
+        raise ScriptParseError("hotkey requires keys, e.g. 'hotkey cmd 1'")
+    key = " ".join(rest).strip().lower()
+    return [f"hotkey(key={_quote_py_string(key)})"]
+
+
+def _cmd_type(ctx: ScriptContext, cmd: str, rest: List[str], tail: str) -> List[str]:
+    # Everything after "type" becomes content; allow "\n" escapes from user input.
+    content = _unescape_type_content(tail)
+    return [f"type(content={_quote_py_string(content)})"]
+
+
+def _cmd_open_app(ctx: ScriptContext, cmd: str, rest: List[str], tail: str) -> List[str]:
+    return _macro_open_app(ctx, tail)
+
+
+def _cmd_include(ctx: ScriptContext, cmd: str, rest: List[str], tail: str) -> List[str]:
+    # DSL include:
+    #   include open_app_spotlight APP=bilibili
+    #   include action_scripts/common/open_app_spotlight.txt APP=bilibili
+    #   run_script open_app_spotlight APP=bilibili
+    if not rest:
+        raise ScriptParseError("%s requires a script name/path" % cmd)
+    target = rest[0].strip()
+    if not target:
+        raise ScriptParseError("%s requires a non-empty script name/path" % cmd)
+    vars_in = _parse_vars_tokens(rest[1:])
+    # Heuristic: if it looks like a path, use path=..., otherwise name=...
+    looks_like_path = (
+        "/" in target
+        or "\\" in target
+        or target.endswith(".txt")
+        or target.startswith(".")
+    )
+    key = "path" if looks_like_path else "name"
+    if vars_in:
+        return [
+            "run_script(%s=%s, vars=%s)"
+            % (key, _quote_py_string(target), json.dumps(vars_in, ensure_ascii=False))
+        ]
+    return ["run_script(%s=%s)" % (key, _quote_py_string(target))]
+
+
+_CMD_DISPATCH: Dict[str, _CmdHandler] = {
+    "iphone_home": _cmd_home,
+    "home": _cmd_home,
+    "iphone_app_switcher": _cmd_app_switcher,
+    "app_switcher": _cmd_app_switcher,
+    "sleep": _cmd_sleep,
+    "wait": _cmd_wait,
+    "swipe": _cmd_swipe,
+    "fswipe": _cmd_swipe,
+    "scroll": _cmd_scroll,
+    "hotkey": _cmd_hotkey,
+    "type": _cmd_type,
+    "open_app": _cmd_open_app,
+    "include": _cmd_include,
+    "run_script": _cmd_include,
+}
+
+
 def _expand_stmt(ctx: ScriptContext, stmt: str) -> List[str]:
     """
     Expand one statement into 1..N UI-TARS action calls.
@@ -260,21 +397,17 @@ def _expand_stmt(ctx: ScriptContext, stmt: str) -> List[str]:
         return []
 
     # Comments
-    if s.startswith("#") or s.startswith("//"):
+    if s.startswith(("#", "//")):
         return []
 
     # Allow raw UI-TARS style action calls, e.g. click(...), iphone_home()
-    if _looks_like_action_call(s):
+    m = _ACTION_CALL_RE.match(s)
+    if m is not None:
         # Normalize bare "iphone_home" -> "iphone_home()"
-        if re.fullmatch(r"(iphone_home|iphone_app_switcher|wait|finished|call_user)\b", s):
-            return [s + "()"]
-        return [s]
+        return [s + "()"] if m.group(1) else [s]
 
     # DSL mode
-    try:
-        toks = shlex.split(s, posix=True)
-    except Exception:
-        toks = s.split()
+    toks = _dsl_split(s)
     if not toks:
         return []
 
@@ -290,70 +423,10 @@ def _expand_stmt(ctx: ScriptContext, stmt: str) -> List[str]:
         except Exception:
             rep = 1
 
-    calls: List[str] = []
-    if cmd in ("iphone_home", "home"):
-        calls = ["iphone_home()"]
-    elif cmd in ("iphone_app_switcher", "app_switcher"):
-        calls = ["iphone_app_switcher()"]
-    elif cmd == "sleep":
-        calls = [_parse_sleep_tokens(rest)]
-    elif cmd == "wait":
-        calls = ["wait()"]
-    elif cmd in ("swipe", "fswipe"):
-        if not rest:
-            raise ScriptParseError("swipe requires a direction: up|down|left|right")
-        d = rest[0].lower().strip()
-        if d not in ("up", "down", "left", "right"):
-            raise ScriptParseError("swipe direction must be up|down|left|right")
-        calls = [f"swipe(direction={_quote_py_string(d)})"]
-    elif cmd == "scroll":
-        if not rest:
-            raise ScriptParseError("scroll requires a direction: up|down|left|right")
-        d = rest[0].lower().strip()
-        if d not in ("up", "down", "left", "right"):
-            raise ScriptParseError("scroll direction must be up|down|left|right")
-        calls = [f"scroll(direction={_quote_py_string(d)})"]
-    elif cmd == "hotkey":
-        if not rest:
-            raise ScriptParseError("hotkey requires keys, e.g. 'hotkey cmd 1'")
-        key = " ".join(rest).strip().lower()
-        calls = [f"hotkey(key={_quote_py_string(key)})"]
-    elif cmd == "type":
-        # Everything after "type" becomes content; allow "\n" escapes from user input.
-        content = s[len(toks[0]) :].lstrip()
-        content = _unescape_type_content(content)
-        calls = [f"type(content={_quote_py_string(content)})"]
-    elif cmd == "open_app":
-        name = s[len(toks[0]) :].lstrip()
-        calls = _macro_open_app(ctx, name)
-    elif cmd in ("include", "run_script"):
-        # DSL include:
-        #   include open_app_spotlight APP=bilibili
-        #   include action_scripts/common/open_app_spotlight.txt APP=bilibili
-        #   run_script open_app_spotlight APP=bilibili
-        if not rest:
-            raise ScriptParseError("%s requires a script name/path" % cmd)
-        target = rest[0].strip()
-        if not target:
-            raise ScriptParseError("%s requires a non-empty script name/path" % cmd)
-        vars_in = _parse_vars_tokens(rest[1:])
-        # Heuristic: if it looks like a path, use path=..., otherwise name=...
-        looks_like_path = (
-            "/" in target
-            or "\\" in target
-            or target.endswith(".txt")
-            or target.startswith(".")
-        )
-        key = "path" if looks_like_path else "name"
-        if vars_in:
-            calls = [
-                "run_script(%s=%s, vars=%s)"
-                % (key, _quote_py_string(target), json.dumps(vars_in, ensure_ascii=False))
-            ]
-        else:
-            calls = ["run_script(%s=%s)" % (key, _quote_py_string(target))]
-    else:
+    handler = _CMD_DISPATCH.get(cmd)
+    if handler is None:
         raise ScriptParseError(f"unknown command: {cmd!r}")
+    calls = handler(ctx, cmd, rest, s[len(toks[0]) :].lstrip())
 
     if rep <= 0:
         return []
@@ -384,24 +457,19 @@ def script_to_action_calls(
     ctx = ScriptContext(base_dir=base_dir, vars=vars)
 
     rendered = render_template(text or "", vars)
-    stmts = _split_top_level(rendered)
 
-    # Additional best-effort splitting for space-joined sequences.
-    expanded_stmts: List[str] = []
-    for st in stmts:
+    # Split, explode and expand in one pass. Pieces from _explode_function_prefix are
+    # already stripped and non-empty, and _expand_stmt never returns blank calls.
+    out: List[str] = []
+    for st in _split_top_level(rendered):
         for piece in _explode_function_prefix(st):
-            piece = piece.strip()
-            if not piece:
-                continue
             if "(" not in piece and ")" not in piece and "=" not in piece:
-                expanded_stmts.extend(_split_compound_no_parens(piece))
+                # Additional best-effort splitting for space-joined sequences.
+                for sub in _split_compound_no_parens(piece):
+                    out += _expand_stmt(ctx, sub)
             else:
-                expanded_stmts.append(piece)
-
-    out: List[str] = []
-    for st in expanded_stmts:
-        out.extend(_expand_stmt(ctx, st))
-    return [x for x in out if x.strip()]
+                out += _expand_stmt(ctx, piece)
+    return out
 
 
 def script_to_predictions(
@@ -411,11 +479,14 @@ def script_to_predictions(
     base_dir: Optional[str] = None,
 ) -> List[PredictionParsed]:
     calls = script_to_action_calls(text, vars=vars, base_dir=base_dir)
-    if not calls:
-        return []
-    joined = "\n".join(calls)
-    preds = parse_predictions("Action: " + joined)
-    return [p for p in preds if p.action_type != "error_env"]
+    # Calls are already split, one action each: parse them individually rather than
+    # re-joining into an "Action: ..." block for parse_predictions() to split again.
+    out: List[PredictionParsed] = []
+    for call in calls:
+        p = parse_single_action(call)
+        if p.action_type != "error_env":
+            out.append(p)
+    return out
 
 
 def _coerce_vars(obj: object) -> Dict[str, str]:
@@ -439,11 +510,20 @@ def parse_run_script_call(src: str) -> Tuple[Optional[str], Optional[str], Dict[
       run_script(path="action_scripts/common/open_app_spotlight.txt", APP="bilibili")
     Returns: (name, path, vars)
     """
-    import ast
-
     s = (src or "").strip()
     if not s:
         raise ScriptParseError("empty run_script()")
+    name, path, vars_items = _parse_run_script_cached(s)
+    return name, path, dict(vars_items)
+
+
+@lru_cache(maxsize=512)
+def _parse_run_script_cached(
+    s: str,
+) -> Tuple[Optional[str], Optional[str], Tuple[Tuple[str, str], ...]]:
+    # Memoized on the raw call text; only the extracted triple is kept, not the AST.
+    import ast
+
     try:
         node = ast.parse(s, mode="eval").body
     except Exception as e:
@@ -486,7 +566,7 @@ def parse_run_script_call(src: str) -> Tuple[Optional[str], Optional[str], Dict[
             # Sugar: run_script("x", APP="bilibili")
             vars_in[str(k)] = "" if v is None else str(v)
 
-    return name, path, vars_in
+    return name, path, tuple(vars_in.items())
 
 
 def run_script_to_predictions(
@@ -506,21 +586,58 @@ def run_script_to_predictions(
     except ScriptRegistryError as e:
         raise ScriptParseError(str(e)) from e
 
-    with open(script_path, "r", encoding="utf-8") as f:
+    return _load_script_predictions(script_path, vars_in)
+
+
+@lru_cache(maxsize=256)
+def _read_script(path: str, mtime_ns: int, size: int) -> Tuple[str, FrozenSet[str]]:
+    with open(path, "r", encoding="utf-8") as f:
         src = f.read()
-    return script_to_predictions(src, vars=vars_in, base_dir=os.path.dirname(script_path))
+    return src, frozenset(_TEMPLATE_RE.findall(src))
 
 
-def _expand_prediction_recursive(
+@lru_cache(maxsize=256)
+def _cached_script_preds(
+    path: str,
+    mtime_ns: int,
+    size: int,
+    vars_key: Tuple[Tuple[str, str], ...],
+    env_key: Tuple[Tuple[str, Optional[str]], ...],
+) -> Tuple[PredictionParsed, ...]:
+    src, _ = _read_script(path, mtime_ns, size)
+    preds = script_to_predictions(src, vars=dict(vars_key), base_dir=os.path.dirname(path))
+    return tuple(preds)
+
+
+def _load_script_predictions(script_path: str, vars_in: Dict[str, str]) -> List[PredictionParsed]:
+    """
+    script_to_predictions() for a script file, memoized on (path, mtime, size, vars) plus
+    the environment values of any ${NAME} the script uses that vars does not supply.
+    """
+    st = os.stat(script_path)
+    _, names = _read_script(script_path, st.st_mtime_ns, st.st_size)
+    env_key = tuple((k, os.environ.get(k)) for k in sorted(names) if k not in vars_in)
+    preds = _cached_script_preds(
+        script_path,
+        st.st_mtime_ns,
+        st.st_size,
+        tuple(sorted(vars_in.items())),
+        env_key,
+    )
+    return list(preds)
+
+
+def _expand_include(
     pred: PredictionParsed,
     *,
     registry_path: str,
     stack: Tuple[str, ...],
     depth_left: int,
-) -> List[PredictionParsed]:
-    if pred.action_type != "run_script":
-        return [pred]
-
+) -> Tuple[str, List[PredictionParsed]]:
+    """
+    Resolve one run_script(...) prediction to (absolute script path, its predictions),
+    enforcing the depth limit and rejecting scripts already on the include stack.
+    """
     if depth_left <= 0:
         raise ScriptParseError("run_script expansion depth exceeded; possible recursion")
 
@@ -541,22 +658,7 @@ def _expand_prediction_recursive(
             % " -> ".join(os.path.basename(p) for p in loop_chain)
         )
 
-    with open(script_path, "r", encoding="utf-8") as f:
-        src = f.read()
-    inner = script_to_predictions(src, vars=vars_in, base_dir=os.path.dirname(script_path))
-
-    out: List[PredictionParsed] = []
-    next_stack = stack + (script_path,)
-    for p in inner:
-        out.extend(
-            _expand_prediction_recursive(
-                p,
-                registry_path=registry_path,
-                stack=next_stack,
-                depth_left=depth_left - 1,
-            )
-        )
-    return out
+    return script_path, _load_script_predictions(script_path, vars_in)
 
 
 def expand_special_predictions(
@@ -570,13 +672,22 @@ def expand_special_predictions(
     """
     depth = max(0, int(max_expand_depth))
     out: List[PredictionParsed] = []
-    for p in list(preds):
-        out.extend(
-            _expand_prediction_recursive(
-                p,
-                registry_path=registry_path,
-                stack=tuple(),
-                depth_left=depth,
-            )
+    # Depth-first worklist of (prediction, include stack, depth left). Children are pushed
+    # in reverse so they pop in script order, same as a recursive expansion would.
+    work: List[Tuple[PredictionParsed, Tuple[str, ...], int]] = [
+        (p, (), depth) for p in reversed(list(preds))
+    ]
+    while work:
+        pred, stack, depth_left = work.pop()
+        if pred.action_type != "run_script":
+            out.append(pred)
+            continue
+        script_path, inner = _expand_include(
+            pred,
+            registry_path=registry_path,
+            stack=stack,
+            depth_left=depth_left,
         )
+        next_stack = stack + (script_path,)
+        work.extend((p, next_stack, depth_left - 1) for p in reversed(inner))
     return out
@@ -1,6 +1,7 @@
 """L0 in-run memoization cache: fingerprint -> known-good actions."""
 from __future__ import annotations
 
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Dict, List, Optional
 
@@ -24,6 +25,8 @@ class L0Cache:
     """In-run fingerprint -> action cache with near-match lookup.
 
     Linear scan is fine for <= *max_entries* entries (64-bit XOR + popcount).
+    Entries are kept in least-recently-used order (store/hit moves to the end),
+    so eviction pops the front instead of scanning for the oldest step.
     """
 
     def __init__(
@@ -36,7 +39,7 @@ class L0Cache:
         self.hash_threshold = hash_threshold
         self.max_reuse = max_reuse
         self.max_entries = max_entries
-        self._entries: Dict[int, L0CacheEntry] = {}
+        self._entries: "OrderedDict[int, L0CacheEntry]" = OrderedDict()
 
     def lookup(self, fingerprint: int) -> Optional[L0CacheEntry]:
         """Find a cache entry within hamming threshold.
@@ -44,18 +47,30 @@ class L0Cache:
         Skips entries that have failed or exhausted their reuse budget.
         Returns the closest match or ``None``.
         """
+        max_reuse = self.max_reuse
+        if self.hash_threshold < 0:
+            return None
+
+        # Unchanged screen: the exact key is the closest possible match.
+        exact = self._entries.get(fingerprint)
+        if exact is not None and exact.succeeded and exact.hit_count < max_reuse:
+            return exact
+
         best: Optional[L0CacheEntry] = None
         best_dist = self.hash_threshold + 1
 
         for entry in self._entries.values():
             if not entry.succeeded:
                 continue
-            if entry.hit_count >= self.max_reuse:
+            if entry.hit_count >= max_reuse:
                 continue
             dist = hamming_distance(fingerprint, entry.fingerprint)
             if dist < best_dist:
                 best_dist = dist
                 best = entry
+                if dist <= 1:
+                    # Distance 0 was handled above, so 1 cannot be beaten.
+                    break
 
         return best
 
@@ -63,6 +78,8 @@ class L0Cache:
         """Increment hit count after a successful cache replay."""
         entry.hit_count += 1
         entry.last_step = step
+        if entry.fingerprint in self._entries:
+            self._entries.move_to_end(entry.fingerprint)
 
     def store(
         self,
@@ -72,11 +89,13 @@ class L0Cache:
         step: int,
     ) -> None:
         """Store a new cache entry after a successful VLM-driven action."""
-        if len(self._entries) >= self.max_entries and fingerprint not in self._entries:
-            oldest_fp = min(self._entries, key=lambda fp: self._entries[fp].last_step)
-            del self._entries[oldest_fp]
+        entries = self._entries
+        if fingerprint in entries:
+            entries.move_to_end(fingerprint)
+        elif len(entries) >= self.max_entries:
+            entries.popitem(last=False)
 
-        self._entries[fingerprint] = L0CacheEntry(
+        entries[fingerprint] = L0CacheEntry(
             fingerprint=fingerprint,
             actions=actions,
             post_fingerprint=post_fingerprint,
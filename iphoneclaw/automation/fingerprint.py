@@ -6,16 +6,16 @@ Produces a 64-bit perceptual hash from a screenshot. Uses only PyObjC/Quartz
 from __future__ import annotations
 
 import base64
-from typing import Optional
+from typing import Optional, Union
 
 import Quartz  # type: ignore
 from Foundation import NSData  # type: ignore
 
 
-def _cgimage_from_jpeg_b64(b64: str) -> Optional["Quartz.CGImageRef"]:
-    """Decode JPEG base64 to CGImageRef."""
+def _cgimage_from_jpeg(jpeg: Union[str, bytes]) -> Optional["Quartz.CGImageRef"]:
+    """Decode JPEG (raw bytes, or base64 text) to CGImageRef."""
     try:
-        raw = base64.b64decode(b64)
+        raw = jpeg if isinstance(jpeg, (bytes, bytearray)) else base64.b64decode(jpeg)
         data = NSData.dataWithBytes_length_(raw, len(raw))
         src = Quartz.CGImageSourceCreateWithData(data, None)
         if src is None:
@@ -44,13 +44,14 @@ def _crop_top(image: "Quartz.CGImageRef", frac: float) -> "Quartz.CGImageRef":
     return cropped if cropped is not None else image
 
 
-def dhash(b64: str, *, status_bar_frac: float = 0.08) -> Optional[int]:
-    """Compute 64-bit dHash from JPEG base64 string.
+def dhash(jpeg: Union[str, bytes], *, status_bar_frac: float = 0.08) -> Optional[int]:
+    """Compute 64-bit dHash from a JPEG, given as raw bytes or a base64 string.
 
-    Returns None if decoding fails.  *status_bar_frac* controls how much of
-    the top of the image to mask out (default 8 % for iPhone status bar).
+    Passing the raw bytes skips a base64 decode.  Returns None if decoding
+    fails.  *status_bar_frac* controls how much of the top of the image to
+    mask out (default 8 % for iPhone status bar).
     """
-    image = _cgimage_from_jpeg_b64(b64)
+    image = _cgimage_from_jpeg(jpeg)
     if image is None:
         return None
 
@@ -88,6 +89,12 @@ def dhash(b64: str, *, status_bar_frac: float = 0.08) -> Optional[int]:
     return hash_val
 
 
+_HAS_BIT_COUNT = hasattr(int, "bit_count")  # Python 3.10+: native popcount
+
+
 def hamming_distance(a: int, b: int) -> int:
     """Count differing bits between two 64-bit hashes."""
-    return bin(a ^ b).count("1")
+    x = a ^ b
+    if _HAS_BIT_COUNT:
+        return x.bit_count()
+    return bin(x).count("1")
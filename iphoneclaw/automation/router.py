@@ -1,7 +1,7 @@
 """L0 automation router: memoization-based action replay."""
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from iphoneclaw.automation.cache import L0Cache, L0CacheEntry
 from iphoneclaw.automation.fingerprint import dhash
@@ -17,7 +17,7 @@ class L0Router:
     Typical usage from the agent loop::
 
         router = L0Router(hash_threshold=5, max_reuse=3)
-        fp = router.fingerprint(shot.base64)
+        fp = router.fingerprint(shot.jpeg)
         hit = router.try_cache(fp, step)
         if hit is not None:
             # execute hit.actions, then:
@@ -40,9 +40,9 @@ class L0Router:
         )
         self.status_bar_frac = status_bar_frac
 
-    def fingerprint(self, b64: str) -> Optional[int]:
-        """Compute dHash fingerprint from screenshot JPEG base64."""
-        return dhash(b64, status_bar_frac=self.status_bar_frac)
+    def fingerprint(self, jpeg: Union[str, bytes]) -> Optional[int]:
+        """Compute dHash fingerprint from screenshot JPEG bytes (or base64)."""
+        return dhash(jpeg, status_bar_frac=self.status_bar_frac)
 
     def try_cache(self, fp: Optional[int], step: int) -> Optional[L0CacheEntry]:
         """Look up a cache entry for *fp*.
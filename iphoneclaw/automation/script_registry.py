@@ -2,19 +2,29 @@ from __future__ import annotations
 
 import json
 import os
-from typing import Dict, Optional
+import threading
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 
 
 class ScriptRegistryError(ValueError):
     pass
 
 
+# Parsed registries keyed by absolute path -> ((st_mtime_ns, st_size), mapping).
+# run_script expansion resolves against the registry on every step that uses it;
+# re-parsing is only needed when the file actually changes on disk.
+_REGISTRY_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, str]]] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
 def _repo_root() -> str:
     # This repo layout is: <root>/iphoneclaw/automation/script_registry.py
     here = os.path.abspath(os.path.dirname(__file__))
     return os.path.abspath(os.path.join(here, "..", ".."))
 
 
+@lru_cache(maxsize=1)
 def default_registry_path() -> str:
     return os.path.join(_repo_root(), "action_scripts", "registry.json")
 
@@ -23,7 +33,14 @@ def load_registry(path: Optional[str]) -> Dict[str, str]:
     """
     Load registry mapping short name -> script path (relative to registry dir).
     If file is missing, returns empty mapping (caller decides behavior).
+    The parsed mapping is memoized per file and re-read when its mtime/size change.
     """
+    return dict(_load_registry_shared(path))
+
+
+def _load_registry_shared(path: Optional[str]) -> Dict[str, str]:
+    # load_registry() without the defensive copy: the returned mapping is the cached
+    # one and must not be mutated. resolve_script_path() only reads from it.
     if not path:
         path = default_registry_path()
     p = os.path.abspath(path)
@@ -33,8 +50,15 @@ def load_registry(path: Optional[str]) -> Dict[str, str]:
         if os.path.exists(p2):
             p = p2
 
-    if not os.path.exists(p):
+    try:
+        st = os.stat(p)
+    except OSError:
         return {}
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _REGISTRY_LOCK:
+        hit = _REGISTRY_CACHE.get(p)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
 
     try:
         with open(p, "r", encoding="utf-8") as f:
@@ -52,6 +76,8 @@ def load_registry(path: Optional[str]) -> Dict[str, str]:
         if not isinstance(v, str) or not v.strip():
             continue
         out[k.strip()] = v.strip()
+    with _REGISTRY_LOCK:
+        _REGISTRY_CACHE[p] = (stamp, out)
     return out
 
 
@@ -71,7 +97,7 @@ def resolve_script_path(
     reg_path = registry_path or default_registry_path()
     reg_path_abs = os.path.abspath(reg_path)
     reg_dir = os.path.dirname(reg_path_abs)
-    reg = load_registry(reg_path)
+    reg = _load_registry_shared(reg_path)
 
     # Registry hit
     if key in reg:
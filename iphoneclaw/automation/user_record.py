@@ -1,14 +1,15 @@
 from __future__ import annotations
 
+import math
 import threading
 import time
 from dataclasses import dataclass
-from typing import List, Optional, Sequence, Tuple
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 import Quartz
 
 from iphoneclaw.macos.user_input_monitor import IPHONECLAW_EVENT_TAG
-from iphoneclaw.types import Rect
+from iphoneclaw.types import DATACLASS_SLOTS, Rect
 
 
 _KEYCODE_MAP = {
@@ -70,15 +71,47 @@ _KEYCODE_MAP = {
 }
 
 
-def _clamp(v: int, lo: int, hi: int) -> int:
-    return max(lo, min(hi, v))
-
-
-def _event_int(event, field_names: Sequence[str]) -> int:
-    for nm in field_names:
-        f = getattr(Quartz, nm, None)
-        if f is None:
-            continue
+def _field_ids(*names: str) -> Tuple[int, ...]:
+    # Resolve CGEventField constants once; older PyObjC builds may lack some of them.
+    return tuple(f for f in (getattr(Quartz, nm, None) for nm in names) if f is not None)
+
+
+_TAG_FIELD = getattr(Quartz, "kCGEventSourceUserData", None)
+_KEYCODE_FIELDS = _field_ids("kCGKeyboardEventKeycode")
+_SCROLL_DY_FIELDS = _field_ids(
+    "kCGScrollWheelEventPointDeltaAxis1",
+    "kCGScrollWheelEventDeltaAxis1",
+)
+_SCROLL_DX_FIELDS = _field_ids(
+    "kCGScrollWheelEventPointDeltaAxis2",
+    "kCGScrollWheelEventDeltaAxis2",
+)
+
+_MOD_CMD = int(getattr(Quartz, "kCGEventFlagMaskCommand", 0))
+_MOD_CTRL = int(getattr(Quartz, "kCGEventFlagMaskControl", 0))
+_MOD_ALT = int(getattr(Quartz, "kCGEventFlagMaskAlternate", 0))
+_MOD_SHIFT = int(getattr(Quartz, "kCGEventFlagMaskShift", 0))
+_MOD_MASK = _MOD_CMD | _MOD_CTRL | _MOD_ALT | _MOD_SHIFT
+
+_T_LEFT_DOWN = int(Quartz.kCGEventLeftMouseDown)
+_T_LEFT_UP = int(Quartz.kCGEventLeftMouseUp)
+_T_LEFT_DRAGGED = int(Quartz.kCGEventLeftMouseDragged)
+_T_RIGHT_DOWN = int(Quartz.kCGEventRightMouseDown)
+_T_SCROLL = int(Quartz.kCGEventScrollWheel)
+_T_KEY_DOWN = int(Quartz.kCGEventKeyDown)
+# CGEventMaskBit(t) is 1 << t; the tap mask is fixed, so build it once here.
+_EVENT_MASK = (
+    (1 << _T_LEFT_DOWN)
+    | (1 << _T_LEFT_UP)
+    | (1 << _T_LEFT_DRAGGED)
+    | (1 << _T_RIGHT_DOWN)
+    | (1 << _T_SCROLL)
+    | (1 << _T_KEY_DOWN)
+)
+
+
+def _event_int(event, fields: Sequence[int]) -> int:
+    for f in fields:
         try:
             return int(Quartz.CGEventGetIntegerValueField(event, f))
         except Exception:
@@ -86,7 +119,7 @@ def _event_int(event, field_names: Sequence[str]) -> int:
     return 0
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class _LeftDownState:
     pos: Tuple[float, float]
     at: float
@@ -122,15 +155,25 @@ class LiveUserActionRecorder:
         self.min_sleep_ms = max(0, int(min_sleep_ms))
         self.max_sleep_ms = max(self.min_sleep_ms, int(max_sleep_ms))
         self.drag_threshold_px = max(1.0, float(drag_threshold_px))
+        self._drag_thr_sq = self.drag_threshold_px * self.drag_threshold_px
         self.include_keyboard = bool(include_keyboard)
 
         self._actions: List[str] = []
         self._last_action_ts: Optional[float] = None
         self._last_inside_ts: float = 0.0
         self._left: Optional[_LeftDownState] = None
-        self._last_hotkey_sig: str = ""
+        self._last_hotkey_sig: int = -1
         self._last_hotkey_ts: float = 0.0
 
+        self._dispatch: Dict[int, Callable[..., None]] = {
+            _T_LEFT_DOWN: self._h_left_down,
+            _T_LEFT_DRAGGED: self._h_left_dragged,
+            _T_LEFT_UP: self._h_left_up,
+            _T_RIGHT_DOWN: self._h_right_down,
+            _T_SCROLL: self._h_scroll,
+            _T_KEY_DOWN: self._h_key_down,
+        }
+
         self._tap = None
         self._source = None
         self._run_loop = None
@@ -139,42 +182,92 @@ class LiveUserActionRecorder:
 
     def _inside(self, pos: Tuple[float, float]) -> bool:
         x, y = pos
-        b = self.bounds
-        return (b.x <= x <= (b.x + b.width)) and (b.y <= y <= (b.y + b.height))
+        return (self._bx <= x <= self._bx2) and (self._by <= y <= self._by2)
+
+    @property
+    def bounds(self) -> Rect:
+        return self._bounds
+
+    @bounds.setter
+    def bounds(self, b: Rect) -> None:
+        self._bounds = b
+        # Cached for _inside/_to_model_xy. A degenerate size divides by inf, which maps
+        # every point to 0 exactly like an explicit zero-size guard would.
+        self._bx = b.x
+        self._by = b.y
+        self._bx2 = b.x + b.width
+        self._by2 = b.y + b.height
+        self._bw = b.width if b.width > 0 else math.inf
+        self._bh = b.height if b.height > 0 else math.inf
+
+    @property
+    def coord_factor(self) -> int:
+        return self._coord_factor
+
+    @coord_factor.setter
+    def coord_factor(self, cf: int) -> None:
+        self._coord_factor = cf
+        # Model coords are clamped to [0, cf], so _box formats from a lookup table.
+        self._istr: Tuple[str, ...] = tuple(map(str, range(cf + 1)))
 
     def _to_model_xy(self, pos: Tuple[float, float]) -> Tuple[int, int]:
         x, y = pos
-        b = self.bounds
-        fx = 0.0 if b.width <= 0 else (x - b.x) / b.width
-        fy = 0.0 if b.height <= 0 else (y - b.y) / b.height
-        mx = _clamp(int(round(fx * self.coord_factor)), 0, self.coord_factor)
-        my = _clamp(int(round(fy * self.coord_factor)), 0, self.coord_factor)
+        cf = self._coord_factor
+        mx = round((x - self._bx) / self._bw * cf)
+        my = round((y - self._by) / self._bh * cf)
+        if mx < 0:
+            mx = 0
+        elif mx > cf:
+            mx = cf
+        if my < 0:
+            my = 0
+        elif my > cf:
+            my = cf
         return mx, my
 
     def _box(self, pos: Tuple[float, float]) -> str:
         mx, my = self._to_model_xy(pos)
-        return f"({mx} {my})"
+        istr = self._istr
+        return "(" + istr[mx] + " " + istr[my] + ")"
 
-    def _emit(self, line: str, now: float) -> None:
+    def _box_if_inside(self, pos: Tuple[float, float]) -> Optional[str]:
+        # _inside and _box in one pass over the cached geometry; None when outside.
+        x, y = pos
+        bx = self._bx
+        by = self._by
+        if not ((bx <= x <= self._bx2) and (by <= y <= self._by2)):
+            return None
+        cf = self._coord_factor
+        mx = round((x - bx) / self._bw * cf)
+        my = round((y - by) / self._bh * cf)
+        istr = self._istr
+        return "(" + istr[min(mx, cf)] + " " + istr[min(my, cf)] + ")"
+
+    def _emit(self, line: str, now: float, *, collapse_repeat: bool = False) -> None:
         line = str(line or "").strip()
         if not line:
             return
+        actions = self._actions
         if self._last_action_ts is not None:
             gap_ms = int(round((now - self._last_action_ts) * 1000.0))
             if gap_ms >= self.min_sleep_ms:
-                self._actions.append(f"sleep(ms={min(gap_ms, self.max_sleep_ms)})")
-        self._actions.append(line)
+                actions.append(f"sleep(ms={min(gap_ms, self.max_sleep_ms)})")
+            elif collapse_repeat and actions[-1] == line:
+                # Same line again with no sleep in between (scroll wheel ticks): keep one.
+                self._last_action_ts = now
+                return
+        actions.append(line)
         self._last_action_ts = now
 
     def _modifiers(self, flags: int) -> List[str]:
         mods: List[str] = []
-        if flags & int(getattr(Quartz, "kCGEventFlagMaskCommand", 0)):
+        if flags & _MOD_CMD:
             mods.append("cmd")
-        if flags & int(getattr(Quartz, "kCGEventFlagMaskControl", 0)):
+        if flags & _MOD_CTRL:
             mods.append("ctrl")
-        if flags & int(getattr(Quartz, "kCGEventFlagMaskAlternate", 0)):
+        if flags & _MOD_ALT:
             mods.append("alt")
-        if flags & int(getattr(Quartz, "kCGEventFlagMaskShift", 0)):
+        if flags & _MOD_SHIFT:
             mods.append("shift")
         return mods
 
@@ -185,22 +278,26 @@ class LiveUserActionRecorder:
         if (now - self._last_inside_ts) > 2.0:
             return
 
-        keycode = _event_int(event, ("kCGKeyboardEventKeycode",))
-        key = _KEYCODE_MAP.get(keycode)
-        if not key:
+        # Plain typing carries no modifier bits; reject it before the keycode field read.
+        flags = int(Quartz.CGEventGetFlags(event)) & _MOD_MASK
+        if not flags:
             return
 
-        flags = int(Quartz.CGEventGetFlags(event))
-        mods = self._modifiers(flags)
-        if not mods:
+        keycode = _event_int(event, _KEYCODE_FIELDS)
+        key = _KEYCODE_MAP.get(keycode)
+        if not key:
             return
 
-        seq = " ".join(mods + [key])
-        if seq == self._last_hotkey_sig and (now - self._last_hotkey_ts) < 0.2:
+        # Dedup key repeats on (modifier bits, keycode) packed into one int; the
+        # "cmd shift p" string is only built once the event is known to be emitted.
+        sig = (keycode << 32) | flags
+        if sig == self._last_hotkey_sig and (now - self._last_hotkey_ts) < 0.2:
             return
-        self._last_hotkey_sig = seq
+        self._last_hotkey_sig = sig
         self._last_hotkey_ts = now
 
+        seq = " ".join(self._modifiers(flags) + [key])
+
         if seq == "cmd 1":
             self._emit("iphone_home()", now)
             return
@@ -210,13 +307,19 @@ class LiveUserActionRecorder:
         self._emit(f"hotkey(key='{seq}')", now)
 
     def _on_event(self, type_: int, event) -> None:
+        # Reject types without a handler (e.g. tap-disabled notifications, which the tap
+        # delivers regardless of its mask) before any Quartz call on the event.
+        handler = self._dispatch.get(type_)
+        if handler is None:
+            return
         now = time.time()
-        try:
-            tag = Quartz.CGEventGetIntegerValueField(event, Quartz.kCGEventSourceUserData)
-            if int(tag) == int(IPHONECLAW_EVENT_TAG):
-                return
-        except Exception:
-            pass
+        if _TAG_FIELD is not None:
+            # Skip events we synthesized ourselves. A failed read still records the event.
+            try:
+                if int(Quartz.CGEventGetIntegerValueField(event, _TAG_FIELD)) == IPHONECLAW_EVENT_TAG:
+                    return
+            except Exception:
+                pass
 
         pos = None
         try:
@@ -225,81 +328,71 @@ class LiveUserActionRecorder:
         except Exception:
             pos = None
 
-        if pos is not None and self._inside(pos):
+        # Bounds test once per event; the branches below reuse it.
+        inside = pos is not None and self._inside(pos)
+        if inside:
             self._last_inside_ts = now
 
-        if type_ == Quartz.kCGEventLeftMouseDown:
-            if pos is not None and self._inside(pos):
-                self._left = _LeftDownState(pos=pos, at=now, dragged=False)
-            return
+        handler(event, pos, inside, now)
 
-        if type_ == Quartz.kCGEventLeftMouseDragged:
-            if self._left is None or pos is None:
-                return
-            dx = pos[0] - self._left.pos[0]
-            dy = pos[1] - self._left.pos[1]
-            if (dx * dx + dy * dy) >= (self.drag_threshold_px * self.drag_threshold_px):
-                self._left.dragged = True
-            return
+    # Per-event-type handlers, dispatched from _on_event via self._dispatch.
+    # pos is None when the event location could not be read; inside is the bounds test of pos.
 
-        if type_ == Quartz.kCGEventLeftMouseUp:
-            if self._left is None:
-                return
-            start = self._left.pos
-            dragged = self._left.dragged
-            self._left = None
+    def _h_left_down(self, event, pos: Optional[Tuple[float, float]], inside: bool, now: float) -> None:
+        if inside:
+            self._left = _LeftDownState(pos=pos, at=now, dragged=False)
 
-            if not self._inside(start):
-                return
-            end = pos if pos is not None else start
-            if dragged:
-                self._emit(
-                    "drag(start_box='%s', end_box='%s')" % (self._box(start), self._box(end)),
-                    now,
-                )
-            else:
-                self._emit("click(start_box='%s')" % self._box(start), now)
+    def _h_left_dragged(self, event, pos: Optional[Tuple[float, float]], inside: bool, now: float) -> None:
+        left = self._left
+        # Once a press is latched as a drag, later samples cannot change the outcome.
+        if left is None or left.dragged or pos is None:
             return
+        dx = pos[0] - left.pos[0]
+        dy = pos[1] - left.pos[1]
+        if (dx * dx + dy * dy) >= self._drag_thr_sq:
+            left.dragged = True
 
-        if type_ == Quartz.kCGEventRightMouseDown:
-            if pos is not None and self._inside(pos):
-                self._emit("right_single(start_box='%s')" % self._box(pos), now)
+    def _h_left_up(self, event, pos: Optional[Tuple[float, float]], inside: bool, now: float) -> None:
+        if self._left is None:
             return
+        start = self._left.pos
+        dragged = self._left.dragged
+        self._left = None
 
-        if type_ == Quartz.kCGEventScrollWheel:
-            if pos is None or not self._inside(pos):
-                return
-            dy = _event_int(
-                event,
-                (
-                    "kCGScrollWheelEventPointDeltaAxis1",
-                    "kCGScrollWheelEventDeltaAxis1",
-                ),
-            )
-            dx = _event_int(
-                event,
-                (
-                    "kCGScrollWheelEventPointDeltaAxis2",
-                    "kCGScrollWheelEventDeltaAxis2",
-                ),
-            )
-            if abs(dx) > abs(dy):
-                if dx == 0:
-                    return
-                direction = "right" if dx > 0 else "left"
-            else:
-                if dy == 0:
-                    return
-                direction = "up" if dy > 0 else "down"
-            self._emit(
-                "scroll(start_box='%s', direction='%s')" % (self._box(pos), direction),
-                now,
-            )
+        start_box = self._box_if_inside(start)
+        if start_box is None:
             return
-
-        if type_ == Quartz.kCGEventKeyDown:
-            self._maybe_emit_hotkey(event, now)
+        if dragged:
+            end_box = self._box(pos) if pos is not None else start_box
+            self._emit("drag(start_box='%s', end_box='%s')" % (start_box, end_box), now)
+        else:
+            self._emit("click(start_box='%s')" % start_box, now)
+
+    def _h_right_down(self, event, pos: Optional[Tuple[float, float]], inside: bool, now: float) -> None:
+        if inside:
+            self._emit("right_single(start_box='%s')" % self._box(pos), now)
+
+    def _h_scroll(self, event, pos: Optional[Tuple[float, float]], inside: bool, now: float) -> None:
+        if not inside:
             return
+        dy = _event_int(event, _SCROLL_DY_FIELDS)
+        dx = _event_int(event, _SCROLL_DX_FIELDS)
+        if abs(dx) > abs(dy):
+            if dx == 0:
+                return
+            direction = "right" if dx > 0 else "left"
+        else:
+            if dy == 0:
+                return
+            direction = "up" if dy > 0 else "down"
+        self._emit(
+            "scroll(start_box='%s', direction='%s')" % (self._box(pos), direction),
+            now,
+            collapse_repeat=True,
+        )
+
+    def _h_key_down(self, event, pos: Optional[Tuple[float, float]], inside: bool, now: float) -> None:
+        self._maybe_emit_hotkey(event, now)
 
     def stop(self) -> None:
         self._stopped = True
@@ -309,32 +402,14 @@ class LiveUserActionRecorder:
         except Exception:
             pass
 
-    def _compact_actions(self) -> List[str]:
-        compact: List[str] = []
-        for ln in self._actions:
-            if compact and ln.startswith("scroll(") and ln == compact[-1]:
-                continue
-            compact.append(ln)
-        return compact
-
     def record(self, *, seconds: float = 0.0) -> List[str]:
-        mask = 0
-        listen = [
-            Quartz.kCGEventLeftMouseDown,
-            Quartz.kCGEventLeftMouseUp,
-            Quartz.kCGEventLeftMouseDragged,
-            Quartz.kCGEventRightMouseDown,
-            Quartz.kCGEventScrollWheel,
-            Quartz.kCGEventKeyDown,
-        ]
-        for t in listen:
-            mask |= Quartz.CGEventMaskBit(t)
+        on_event = self._on_event
 
         def cb(_proxy, type_, event, _refcon):  # noqa: ANN001
             if self._stopped:
                 return event
             try:
-                self._on_event(int(type_), event)
+                on_event(int(type_), event)
             except Exception:
                 # Keep recording even if one event parse fails.
                 pass
@@ -345,7 +420,7 @@ class LiveUserActionRecorder:
             Quartz.kCGSessionEventTap,
             Quartz.kCGHeadInsertEventTap,
             Quartz.kCGEventTapOptionListenOnly,
-            mask,
+            _EVENT_MASK,
             cb,
             None,
         )
@@ -384,4 +459,4 @@ class LiveUserActionRecorder:
             except Exception:
                 pass
 
-        return self._compact_actions()
+        return list(self._actions)
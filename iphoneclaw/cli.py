@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import argparse
-import base64
 import os
 import re
 import subprocess
@@ -92,7 +91,7 @@ def cmd_screenshot(args: argparse.Namespace) -> int:
     else:
         out_path = os.path.abspath(out_path)
 
-    jpg = base64.b64decode(shot.base64)
+    jpg = shot.jpeg
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
     with open(out_path, "wb") as f:
         f.write(jpg)
@@ -118,7 +117,7 @@ def cmd_calibrate(args: argparse.Namespace) -> int:
     os.makedirs(out_dir, exist_ok=True)
     out_path = os.path.join(out_dir, "calibrate_screenshot.jpg")
 
-    jpg = base64.b64decode(shot.base64)
+    jpg = shot.jpeg
     with open(out_path, "wb") as f:
         f.write(jpg)
 
@@ -286,7 +285,7 @@ def cmd_run(args: argparse.Namespace) -> int:
 
     hub = SupervisorHub()
     control = WorkerControl()
-    conv = ConversationStore()
+    conv = ConversationStore(max_items=cfg.conversation_max_items)
     # Create a recorder up-front so the supervisor server can expose run artifacts.
     from iphoneclaw.agent.recorder import RunRecorder
     recorder = RunRecorder(cfg)
@@ -303,6 +302,7 @@ def cmd_run(args: argparse.Namespace) -> int:
     finally:
         if srv is not None:
             srv.stop()
+        recorder.flush()
     return 0
 
 
@@ -637,8 +637,8 @@ def cmd_script_run(args: argparse.Namespace) -> int:
     # Allow longer scripts; caller can keep them small, but CLI shouldn't hard-cap at 3.
     for p in preds:
         res = execute_action(cfg, p, shot)
-        results.append(res)
-        if not bool(res.get("ok")) and not bool(args.keep_going):
+        results.append(res.to_dict())
+        if not res.ok and not bool(args.keep_going):
             break
 
     import json
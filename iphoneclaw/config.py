@@ -16,6 +16,9 @@ class Config:
     max_tokens: int = 8192
     temperature: float = 0.0
     top_p: float = 0.7
+    # Compress large (screenshot-carrying) request bodies: "" (off) | gzip | zstd (needs
+    # zstandard). Only useful on slow uplinks and with servers that accept Content-Encoding.
+    model_request_encoding: str = ""
 
     # Volcengine/Doubao compatibility knobs (OpenAI-compatible, but has quirks).
     # - "thinking" field is accepted by Ark; keep disabled by default for stability.
@@ -27,6 +30,20 @@ class Config:
     language: str = "en"
     dry_run: bool = False
 
+    # Upper bound on in-memory conversation items (oldest evicted first); 0 = unbounded.
+    # Prompts only use the last few rounds, so this just caps memory on very long runs.
+    conversation_max_items: int = 0
+
+    # JPEG resize backend for model input: appkit (default) | cv2 | vips. The optional ones fall
+    # back to AppKit when opencv-python+numpy / pyvips are missing. Both release the GIL while
+    # decoding/encoding; vips also decodes large JPEGs at reduced size (shrink-on-load).
+    jpeg_backend: str = "appkit"
+
+    # Screenshot JPEG encoder: appkit (default) | turbo. turbo uses PyTurboJPEG+numpy when
+    # installed and the bitmap layout is known, AppKit otherwise. Its output carries no ICC
+    # profile, unlike AppKit's.
+    capture_jpeg_backend: str = "appkit"
+
     # Model coordinate system factor (UI-TARS typically uses 0..1000)
     coord_factor: int = 1000
 
@@ -103,6 +120,9 @@ def load_config_from_env() -> Config:
     c.model_base_url = os.getenv("IPHONECLAW_MODEL_BASE_URL", c.model_base_url)
     c.model_api_key = os.getenv("IPHONECLAW_MODEL_API_KEY", c.model_api_key)
     c.model_name = os.getenv("IPHONECLAW_MODEL_NAME", c.model_name)
+    c.model_request_encoding = os.getenv(
+        "IPHONECLAW_MODEL_REQUEST_ENCODING", c.model_request_encoding
+    ).strip().lower()
     c.supervisor_host = os.getenv("IPHONECLAW_SUPERVISOR_HOST", c.supervisor_host)
     c.supervisor_port = int(os.getenv("IPHONECLAW_SUPERVISOR_PORT", str(c.supervisor_port)))
     c.supervisor_token = os.getenv("IPHONECLAW_SUPERVISOR_TOKEN", c.supervisor_token)
@@ -116,6 +136,13 @@ def load_config_from_env() -> Config:
         "IPHONECLAW_ENABLE_SUPERVISOR_EXEC", "1" if c.enable_supervisor_exec else "0"
     ).strip().lower() in ("1", "true", "yes", "y", "on")
     c.script_registry_path = os.getenv("IPHONECLAW_SCRIPT_REGISTRY", c.script_registry_path)
+    c.conversation_max_items = int(
+        os.getenv("IPHONECLAW_CONVERSATION_MAX_ITEMS", str(c.conversation_max_items))
+    )
+    c.jpeg_backend = os.getenv("IPHONECLAW_JPEG_BACKEND", c.jpeg_backend).strip().lower()
+    c.capture_jpeg_backend = (
+        os.getenv("IPHONECLAW_CAPTURE_JPEG_BACKEND", c.capture_jpeg_backend).strip().lower()
+    )
 
     # AppleScript runner mode for typing/hotkeys.
     c.applescript_mode = os.getenv("IPHONECLAW_APPLESCRIPT_MODE", c.applescript_mode)
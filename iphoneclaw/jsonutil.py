@@ -0,0 +1,21 @@
+"""JSON encoding helpers with an optional orjson fast path (no hard dependency)."""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Compact UTF-8 JSON bytes (non-ASCII kept as-is)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # e.g. non-str dict keys or >64-bit ints: let the stdlib encoder decide.
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
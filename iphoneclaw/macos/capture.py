@@ -2,10 +2,9 @@
 
 from __future__ import annotations
 
-import base64
 import logging
 from dataclasses import asdict
-from typing import Optional, Tuple
+from typing import Any, Optional, Tuple
 
 import Quartz
 from AppKit import NSBitmapImageRep, NSJPEGFileType
@@ -18,6 +17,100 @@ logger = logging.getLogger(__name__)
 # NSBitmapImageRep property key
 NSImageCompressionFactor = "NSImageCompressionFactor"
 
+# Screenshot JPEG quality (AppKit compression factor 0.75).
+_JPEG_QUALITY = 75
+
+# PyTurboJPEG handle: None = not probed yet, False = unavailable.
+_turbo: Any = None
+
+
+def _turbojpeg() -> Any:
+    global _turbo
+    if _turbo is None:
+        try:
+            from turbojpeg import TurboJPEG  # type: ignore
+
+            _turbo = TurboJPEG()
+        except Exception:
+            _turbo = False
+    return _turbo or None
+
+
+# NSBitmapFormat bits (AppKit); only the ones that affect the packed byte order.
+_NS_ALPHA_FIRST = 1 << 0
+_NS_FLOAT = 1 << 2
+_NS_16_LITTLE = 1 << 8
+_NS_32_LITTLE = 1 << 9
+
+
+def _turbo_pixel_format(
+    turbojpeg: Any, bytes_per_pixel: int, bitmap_format: int, has_alpha: bool
+) -> Optional[int]:
+    """
+    Map a packed 8-bit NSBitmapImageRep layout to a TurboJPEG pixel format, or None when
+    the layout is not one we know the byte order of. 32-bit little-endian reverses the
+    component order in memory: alpha-first ARGB is stored as BGRA (the usual layout of a
+    window capture) and alpha-last RGBA as ABGR.
+    """
+    if bitmap_format & (_NS_FLOAT | _NS_16_LITTLE):
+        return None
+    alpha_first = bool(bitmap_format & _NS_ALPHA_FIRST)
+    little = bool(bitmap_format & _NS_32_LITTLE)
+    if bytes_per_pixel == 3:
+        return None if (alpha_first or little) else turbojpeg.TJPF_RGB
+    if bytes_per_pixel != 4:
+        return None
+    if little:
+        if alpha_first:
+            return turbojpeg.TJPF_BGRA if has_alpha else turbojpeg.TJPF_BGRX
+        return turbojpeg.TJPF_ABGR if has_alpha else turbojpeg.TJPF_XBGR
+    if alpha_first:
+        return turbojpeg.TJPF_ARGB if has_alpha else turbojpeg.TJPF_XRGB
+    return turbojpeg.TJPF_RGBA if has_alpha else turbojpeg.TJPF_RGBX
+
+
+def _encode_jpeg_turbo(bitmap: Any, quality: int) -> Optional[bytes]:
+    """
+    Encode an 8-bit packed RGB(A) NSBitmapImageRep with libjpeg-turbo (SIMD DCT/Huffman),
+    reading the pixel buffer in place. Returns None when PyTurboJPEG/numpy are missing or
+    the bitmap layout is not supported, so the caller falls back to AppKit.
+    """
+    tj = _turbojpeg()
+    if tj is None:
+        return None
+    try:
+        import numpy as np  # type: ignore
+        import turbojpeg  # type: ignore
+
+        if bitmap.isPlanar() or int(bitmap.bitsPerSample()) != 8:
+            return None
+        w = int(bitmap.pixelsWide())
+        h = int(bitmap.pixelsHigh())
+        bytes_per_pixel = int(bitmap.bitsPerPixel()) // 8
+        if w <= 0 or h <= 0:
+            return None
+        pixel_format = _turbo_pixel_format(
+            turbojpeg, bytes_per_pixel, int(bitmap.bitmapFormat()), bool(bitmap.hasAlpha())
+        )
+        if pixel_format is None:
+            return None
+        data = bitmap.bitmapData()
+        if data is None:
+            return None
+        # (h, w, c) view over the rows; row padding is skipped via the row stride.
+        pix = np.ndarray(
+            (h, w, bytes_per_pixel),
+            dtype=np.uint8,
+            buffer=memoryview(data),
+            strides=(int(bitmap.bytesPerRow()), bytes_per_pixel, 1),
+        )
+        return bytes(
+            tj.encode(pix, quality=quality, pixel_format=pixel_format, jpeg_subsample=turbojpeg.TJSAMP_420)
+        )
+    except Exception:
+        return None
+
+
 def _is_near_white(r: int, g: int, b: int, *, thr: int) -> bool:
     return r >= thr and g >= thr and b >= thr
 
@@ -314,7 +407,7 @@ def _auto_crop_white_border_px(
 
             # Step 2: robust near-white trim using JPEG round-trip to remove
             # alpha/format ambiguity. This mirrors what downstream consumers see
-            # in shot.base64 (JPEG).
+            # in shot.jpeg.
             # Robust path: JPEG round-trip from CGImage to remove alpha/format ambiguity.
             jpeg_data = bitmap.representationUsingType_properties_(
                 NSJPEGFileType,
@@ -416,15 +509,16 @@ def _bounds_for_crop(bounds: Rect, *, crop_rect_px: Tuple[int, int, int, int], s
 
 
 class ScreenCapture:
-    """Captures the target window as JPEG base64."""
+    """Captures the target window as JPEG."""
 
-    def __init__(self, window_finder: WindowFinder):
+    def __init__(self, window_finder: WindowFinder, *, jpeg_backend: str = "appkit"):
         self.wf = window_finder
+        self.jpeg_backend = jpeg_backend
         self._crop_rect_px: Optional[Tuple[int, int, int, int]] = None
         self._last_raw_size: Optional[Tuple[int, int]] = None
 
     def capture(self) -> ScreenshotOutput:
-        """Capture the target window. Returns JPEG base64 + metadata."""
+        """Capture the target window. Returns JPEG bytes + metadata."""
         wid = self.wf.window_id
         bounds = self.wf.refresh()
 
@@ -490,17 +584,18 @@ class ScreenCapture:
         img_w = int(Quartz.CGImageGetWidth(image))
         img_h = int(Quartz.CGImageGetHeight(image))
 
-        # Convert CGImage -> JPEG base64 (cropped if crop_rect_px set).
+        # Convert CGImage -> JPEG (cropped if crop_rect_px set); base64 is derived on demand.
+        # jpeg_backend="turbo" tries libjpeg-turbo first; AppKit otherwise or as fallback.
         bitmap = NSBitmapImageRep.alloc().initWithCGImage_(image)
-        jpeg_data = bitmap.representationUsingType_properties_(
-            NSJPEGFileType,
-            {NSImageCompressionFactor: 0.75},
-        )
-
-        if jpeg_data is None:
-            raise RuntimeError("Failed to encode screenshot as JPEG")
-
-        b64 = base64.b64encode(bytes(jpeg_data)).decode("ascii")
+        jpeg = _encode_jpeg_turbo(bitmap, _JPEG_QUALITY) if self.jpeg_backend == "turbo" else None
+        if jpeg is None:
+            jpeg_data = bitmap.representationUsingType_properties_(
+                NSJPEGFileType,
+                {NSImageCompressionFactor: _JPEG_QUALITY / 100.0},
+            )
+            if jpeg_data is None:
+                raise RuntimeError("Failed to encode screenshot as JPEG")
+            jpeg = bytes(jpeg_data)
 
         logger.debug(
             "Captured: %dx%d px (raw %dx%d), bounds=%s, crop=%s, scale=%.2f",
@@ -514,7 +609,7 @@ class ScreenCapture:
         )
 
         return ScreenshotOutput(
-            base64=b64,
+            jpeg=jpeg,
             scale_factor=scale_factor,
             window_bounds=bounds,
             image_width=int(img_w),
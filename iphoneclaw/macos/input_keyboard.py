@@ -7,7 +7,7 @@ This is intentionally minimal at first (only keys we need early).
 from __future__ import annotations
 
 import time
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, Optional, Sequence
 
 import Quartz
 
@@ -100,12 +100,12 @@ def _flags_for(mods: Iterable[str]) -> int:
     return flags
 
 
-def press(key: str, modifiers: Optional[List[str]] = None, delay_s: float = 0.02) -> None:
+def press(key: str, modifiers: Optional[Sequence[str]] = None, delay_s: float = 0.02) -> None:
     k = key.lower().strip()
     if k not in KEYCODES:
         raise ValueError(f"Unsupported key: {key!r}")
 
-    flags = _flags_for(modifiers or [])
+    flags = _flags_for(modifiers or ())
     keycode = KEYCODES[k]
 
     down = Quartz.CGEventCreateKeyboardEvent(None, keycode, True)
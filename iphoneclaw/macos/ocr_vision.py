@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import base64
 import json
 import os
 import time
@@ -33,12 +32,7 @@ def _clamp01(v: float) -> float:
     return v
 
 
-def _decode_screenshot_to_cgimage(image_b64: str):
-    try:
-        raw = base64.b64decode(image_b64)
-    except Exception as e:
-        raise RuntimeError("invalid screenshot base64: %s" % str(e)) from e
-
+def _decode_screenshot_to_cgimage(raw: bytes):
     cf_data = Quartz.CFDataCreate(None, raw, len(raw))
     if cf_data is None:
         raise RuntimeError("failed to create CFData from screenshot bytes")
@@ -131,7 +125,7 @@ def recognize_screenshot_text(
             "Apple Vision framework is unavailable. Install pyobjc-framework-Vision on macOS."
         ) from e
 
-    cg = _decode_screenshot_to_cgimage(shot.base64)
+    cg = _decode_screenshot_to_cgimage(shot.jpeg)
     req = Vision.VNRecognizeTextRequest.alloc().init()
     # Accurate mode gives better OCR quality on UI text.
     req.setRecognitionLevel_(Vision.VNRequestTextRecognitionLevelAccurate)
@@ -234,7 +228,7 @@ def save_ocr_debug_visualization(
     json_path = os.path.abspath(os.path.join(out_dir, stem + "_ocr.json"))
 
     # Save raw screenshot bytes.
-    raw = base64.b64decode(shot.base64)
+    raw = shot.jpeg
     with open(raw_path, "wb") as f:
         f.write(raw)
 
@@ -243,7 +237,7 @@ def save_ocr_debug_visualization(
         json.dump(payload, f, ensure_ascii=False, indent=2)
 
     # Draw overlay boxes on top of screenshot.
-    cg = _decode_screenshot_to_cgimage(shot.base64)
+    cg = _decode_screenshot_to_cgimage(raw)
     w = int(Quartz.CGImageGetWidth(cg))
     h = int(Quartz.CGImageGetHeight(cg))
     if w <= 0 or h <= 0:
@@ -1,21 +1,130 @@
 from __future__ import annotations
 
+import gzip
+import http.client
+import io
 import json
+import threading
 import time
 import urllib.error
+import urllib.parse
 import urllib.request
 from typing import Any, Dict, List, Optional, Tuple
 
+from iphoneclaw.jsonutil import dumps_bytes
 from iphoneclaw.types import InvokeResult, PredictionParsed
 
+_TIMEOUT_S = 180
+# Only bodies at least this large are compressed (i.e. ones carrying a screenshot).
+_COMPRESS_MIN_BYTES = 32 * 1024
+
+
+def _compress_body(encoding: str, data: bytes) -> bytes:
+    if encoding == "zstd":
+        import zstandard  # type: ignore
+
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return gzip.compress(data, compresslevel=1, mtime=0)
+
+
+def _normalize_request_encoding(encoding: str) -> str:
+    enc = (encoding or "").strip().lower()
+    if enc == "zstd":
+        try:
+            import zstandard  # type: ignore  # noqa: F401
+        except Exception:
+            return ""
+        return enc
+    return enc if enc == "gzip" else ""
+
+
+def _uses_proxy(scheme: str, host: str) -> bool:
+    try:
+        return bool(urllib.request.getproxies().get(scheme)) and not urllib.request.proxy_bypass(host)
+    except Exception:
+        return True
+
 
 class OpenAICompatClient:
     """Tiny OpenAI-compatible chat.completions client (no external deps)."""
 
-    def __init__(self, base_url: str, api_key: str, model: str):
+    def __init__(self, base_url: str, api_key: str, model: str, *, request_encoding: str = ""):
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
         self.model = model
+        # Optional Content-Encoding for large request bodies: "" (off) | "gzip" | "zstd".
+        # zstd needs the zstandard package (off when missing); a 415 reply turns it off.
+        self.request_encoding = _normalize_request_encoding(request_encoding)
+
+        # One kept-alive connection per client so steps after the first skip the TCP/TLS
+        # handshake. Proxied (HTTP(S)_PROXY) or unusual URLs keep using urllib per request.
+        self._url = self.base_url + "/chat/completions"
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._conn_lock = threading.Lock()
+        self._conn_target: Optional[Tuple[str, str, Optional[int]]] = None
+        self._path = ""
+        parts = urllib.parse.urlsplit(self._url)
+        if parts.scheme in ("http", "https") and parts.hostname and not parts.username:
+            if not _uses_proxy(parts.scheme, parts.hostname):
+                self._conn_target = (parts.scheme, parts.hostname, parts.port)
+                self._path = parts.path + ("?" + parts.query if parts.query else "")
+
+    def close(self) -> None:
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _post(self, data: bytes, headers: Dict[str, str]) -> bytes:
+        """POST to chat/completions; raises urllib.error.HTTPError on non-2xx HTTP status."""
+        if self._conn_target is None:
+            req = urllib.request.Request(self._url, data=data, method="POST", headers=headers)
+            with urllib.request.urlopen(req, timeout=_TIMEOUT_S) as resp:
+                return resp.read()
+        with self._conn_lock:
+            reused = self._conn is not None
+            try:
+                return self._post_once(data, headers)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server closed an idle keep-alive connection; retry once on a fresh one.
+                if not reused:
+                    raise
+                return self._post_once(data, headers)
+
+    def _send(self, data: bytes, headers: Dict[str, str]) -> bytes:
+        enc = self.request_encoding
+        if not enc or len(data) < _COMPRESS_MIN_BYTES:
+            return self._post(data, headers)
+        try:
+            return self._post(_compress_body(enc, data), {**headers, "Content-Encoding": enc})
+        except urllib.error.HTTPError as e:
+            if e.code != 415:
+                raise
+        # The server does not accept compressed request bodies; send identity from now on.
+        self.request_encoding = ""
+        return self._post(data, headers)
+
+    def _post_once(self, data: bytes, headers: Dict[str, str]) -> bytes:
+        conn = self._conn
+        if conn is None:
+            scheme, host, port = self._conn_target  # type: ignore[misc]
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = self._conn = cls(host, port, timeout=_TIMEOUT_S)
+        try:
+            conn.request("POST", self._path, body=data, headers=headers)
+            resp = conn.getresponse()
+            raw = resp.read()
+        except BaseException:
+            conn.close()
+            self._conn = None
+            raise
+        if resp.will_close:
+            conn.close()
+            self._conn = None
+        # http.client does not follow redirects; surface them like urllib's unredirected POST.
+        if resp.status >= 300:
+            raise urllib.error.HTTPError(self._url, resp.status, resp.reason, resp.headers, io.BytesIO(raw))
+        return raw
 
     def chat_completions(
         self,
@@ -28,7 +137,6 @@ class OpenAICompatClient:
         retry_backoff_s: float = 0.8,
         extra_body: Optional[Dict[str, Any]] = None,
     ) -> Tuple[str, int]:
-        url = self.base_url + "/chat/completions"
         body = {
             "model": self.model,
             "messages": messages,
@@ -38,19 +146,18 @@ class OpenAICompatClient:
         }
         if extra_body:
             body.update(extra_body)
-        data = json.dumps(body).encode("utf-8")
+        # Vision bodies carry a multi-MB base64 data URL; encode via orjson when installed.
+        data = dumps_bytes(body)
         last_err = None
         last_http_body = None
         last_http_code = None
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
         for attempt in range(max(1, int(retries))):
-            req = urllib.request.Request(url, data=data, method="POST")
-            req.add_header("Content-Type", "application/json")
-            if self.api_key:
-                req.add_header("Authorization", f"Bearer {self.api_key}")
             try:
-                with urllib.request.urlopen(req, timeout=180) as resp:
-                    raw = resp.read().decode("utf-8", errors="replace")
-                    payload = json.loads(raw)
+                raw = self._send(data, headers).decode("utf-8", errors="replace")
+                payload = json.loads(raw)
                 last_err = None
                 break
             except urllib.error.HTTPError as e:
@@ -60,8 +167,8 @@ class OpenAICompatClient:
                     last_http_body = e.read().decode("utf-8", errors="replace")
                 except Exception:
                     last_http_body = None
-                # Do not retry on 4xx except 408/429.
-                if last_http_code and 400 <= int(last_http_code) < 500 and int(last_http_code) not in (408, 429):
+                # Do not retry on 3xx/4xx except 408/429.
+                if last_http_code and 300 <= int(last_http_code) < 500 and int(last_http_code) not in (408, 429):
                     break
                 if attempt >= retries - 1:
                     break
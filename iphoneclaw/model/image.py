@@ -1,13 +1,21 @@
 from __future__ import annotations
 
 import base64
-from typing import Tuple
+import logging
+from functools import lru_cache, partial
+from typing import Any, Callable, Optional, Tuple
 
 from iphoneclaw.constants import IMAGE_FACTOR, MAX_PIXELS_V1_5, MIN_PIXELS
 
+logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=16)
 def smart_resize(width: int, height: int) -> Tuple[int, int]:
-    """Match UI-TARS style resizing constraints (multiple of IMAGE_FACTOR)."""
+    """Match UI-TARS style resizing constraints (multiple of IMAGE_FACTOR).
+
+    Pure in (width, height); memoized since the window size rarely changes between steps.
+    """
     if width <= 0 or height <= 0:
         return width, height
 
@@ -27,32 +35,96 @@ def smart_resize(width: int, height: int) -> Tuple[int, int]:
     return width, height
 
 
-def data_url_from_jpeg_base64(b64: str) -> str:
-    # Model servers typically accept data URLs; keep it simple.
-    # Input is base64-encoded JPEG bytes already.
-    return "data:image/jpeg;base64," + b64
+_JPEG_DATA_URL_PREFIX = b"data:image/jpeg;base64,"
+
+
+def data_url_from_jpeg(raw: bytes) -> str:
+    # Model servers typically accept data URLs. One base64 pass, no separate base64 str kept.
+    return (_JPEG_DATA_URL_PREFIX + base64.b64encode(raw)).decode("ascii")
+
+
+def _resize_jpeg_cv2(
+    cv2: Any, np: Any, raw: bytes, out_w: int, out_h: int, *, quality: float
+) -> Optional[bytes]:
+    """OpenCV resize; returns None when decoding fails."""
+    try:
+        img = cv2.imdecode(np.frombuffer(raw, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            return None
+        img = cv2.resize(img, (int(out_w), int(out_h)), interpolation=cv2.INTER_AREA)
+        ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, int(round(quality * 100))])
+        if not ok:
+            return None
+        return buf.tobytes()
+    except Exception:
+        return None
+
+
+def _resize_jpeg_vips(pyvips: Any, raw: bytes, out_w: int, out_h: int, *, quality: float) -> Optional[bytes]:
+    """libvips resize; returns None when decoding fails.
+
+    thumbnail_buffer uses JPEG shrink-on-load, so large downscales decode fewer pixels.
+    """
+    try:
+        img = pyvips.Image.thumbnail_buffer(raw, int(out_w), height=int(out_h), size="force")
+        return bytes(img.jpegsave_buffer(Q=int(round(quality * 100))))
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=None)
+def _load_backend(name: str) -> Optional[Callable[..., Optional[bytes]]]:
+    """
+    Resolve an optional resize backend once per process. Returns None for "appkit", and
+    logs a single warning for an unknown name or a backend whose package is missing.
+    """
+    if not name or name == "appkit":
+        return None
+    try:
+        if name == "cv2":
+            import cv2  # type: ignore
+            import numpy as np  # type: ignore
+
+            return partial(_resize_jpeg_cv2, cv2, np)
+        if name == "vips":
+            import pyvips  # type: ignore
+
+            return partial(_resize_jpeg_vips, pyvips)
+    except Exception as e:
+        logger.warning("jpeg_backend %r unavailable (%s); resizing with AppKit", name, e)
+        return None
+    logger.warning("unknown jpeg_backend %r; resizing with AppKit", name)
+    return None
 
 
-def resize_jpeg_base64(b64: str, out_w: int, out_h: int, *, quality: float = 0.8) -> str:
+def resize_jpeg(
+    raw: bytes, out_w: int, out_h: int, *, quality: float = 0.8, backend: str = "appkit"
+) -> bytes:
     """
-    Resize JPEG(base64) to (out_w,out_h) using AppKit.
-    Returns base64 JPEG bytes.
+    Resize raw JPEG bytes to (out_w,out_h).
+    backend: "appkit" (default), "cv2" or "vips"; the optional ones fall back to AppKit
+    when their package is unavailable.
+    Returns the input object unchanged when resizing is not possible.
     """
     if out_w <= 0 or out_h <= 0:
-        return b64
+        return raw
+    alt = _load_backend(backend)
+    if alt is not None:
+        out = alt(raw, out_w, out_h, quality=quality)
+        if out is not None:
+            return out
     try:
         from AppKit import NSBitmapImageRep, NSDeviceRGBColorSpace, NSImage, NSJPEGFileType  # type: ignore
         from Foundation import NSData  # type: ignore
     except Exception:
         # If AppKit isn't available, do not resize.
-        return b64
+        return raw
 
     try:
-        raw = base64.b64decode(b64)
         data = NSData.dataWithBytes_length_(raw, len(raw))
         img = NSImage.alloc().initWithData_(data)
         if img is None:
-            return b64
+            return raw
 
         # Draw into a new bitmap at target size.
         rep = NSBitmapImageRep.alloc().initWithBitmapDataPlanes_pixelsWide_pixelsHigh_bitsPerSample_samplesPerPixel_hasAlpha_isPlanar_colorSpaceName_bytesPerRow_bitsPerPixel_(
@@ -68,7 +140,7 @@ def resize_jpeg_base64(b64: str, out_w: int, out_h: int, *, quality: float = 0.8
             0,
         )
         if rep is None:
-            return b64
+            return raw
 
         from AppKit import NSGraphicsContext  # type: ignore
 
@@ -82,7 +154,7 @@ def resize_jpeg_base64(b64: str, out_w: int, out_h: int, *, quality: float = 0.8
 
         jpeg = rep.representationUsingType_properties_(NSJPEGFileType, {"NSImageCompressionFactor": float(quality)})
         if jpeg is None:
-            return b64
-        return base64.b64encode(bytes(jpeg)).decode("ascii")
+            return raw
+        return bytes(jpeg)
     except Exception:
-        return b64
+        return raw
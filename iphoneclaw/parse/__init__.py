@@ -1,4 +1,4 @@
-from iphoneclaw.parse.action_parser import parse_predictions
+from iphoneclaw.parse.action_parser import parse_predictions, parse_single_action
 from iphoneclaw.parse.hotkey_map import maybe_rewrite_hotkey
 
-__all__ = ["parse_predictions", "maybe_rewrite_hotkey"]
+__all__ = ["parse_predictions", "parse_single_action", "maybe_rewrite_hotkey"]
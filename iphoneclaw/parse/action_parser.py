@@ -95,7 +95,8 @@ def _split_args(args_str: str) -> List[str]:
             buf.append(ch)
             continue
         if ch == ")":
-            depth = max(0, depth - 1)
+            if depth:
+                depth -= 1
             buf.append(ch)
             continue
         if ch == "," and depth == 0:
@@ -221,7 +222,8 @@ def _split_actions(action_str: str) -> List[str]:
             buf.append(ch)
             continue
         if ch == ")":
-            depth = max(0, depth - 1)
+            if depth:
+                depth -= 1
             buf.append(ch)
             continue
         if depth == 0 and ch in (";", "\n"):
@@ -248,64 +250,71 @@ def parse_predictions(text: str) -> List[PredictionParsed]:
         ]
 
     # Parse multiple actions; tolerate UI-TARS-desktop and provider variations.
-    raw_actions = _split_actions(action_str)
-    out: List[PredictionParsed] = []
-    for raw in raw_actions:
-        try:
-            action_type, kwargs = _parse_action_call(raw.strip())
-        except Exception as e:
-            out.append(
-                PredictionParsed(
-                    action_type="error_env",
-                    action_inputs=ActionInputs(content=f"parse error: {e}"),
-                    thought=thought,
-                    reflection=reflection,
-                    raw_action=raw.strip(),
-                )
-            )
-            continue
-
-        ai = ActionInputs()
-        # UI-TARS sometimes uses "text" for typing.
-        if "content" in kwargs:
-            ai.content = str(kwargs["content"])
-        elif "text" in kwargs:
-            ai.content = str(kwargs["text"])
-        if "start_box" in kwargs:
-            ai.start_box = str(kwargs["start_box"])
-        if "end_box" in kwargs:
-            ai.end_box = str(kwargs["end_box"])
-        if "key" in kwargs:
-            ai.key = str(kwargs["key"])
-        elif "hotkey" in kwargs:
-            ai.key = str(kwargs["hotkey"])
-        if "direction" in kwargs:
-            ai.direction = str(kwargs["direction"])
-        # Optional timing helpers.
-        if "seconds" in kwargs:
-            try:
-                ai.seconds = float(kwargs["seconds"])
-            except Exception:
-                ai.seconds = None
-        if "ms" in kwargs:
-            try:
-                ai.ms = int(kwargs["ms"])
-            except Exception:
-                ai.ms = None
-        if "interval_ms" in kwargs:
-            try:
-                ai.interval_ms = int(kwargs["interval_ms"])
-            except Exception:
-                ai.interval_ms = None
-
-        out.append(
-            PredictionParsed(
-                action_type=action_type,
-                action_inputs=ai,
-                thought=thought,
-                reflection=reflection,
-                raw_action=raw.strip(),
-            )
+    return [
+        parse_single_action(raw, thought=thought, reflection=reflection)
+        for raw in _split_actions(action_str)
+    ]
+
+
+def parse_single_action(
+    raw: str,
+    *,
+    thought: str = "",
+    reflection: Optional[str] = None,
+) -> PredictionParsed:
+    """
+    Parse one action call string (no "Thought:"/"Action:" framing, no splitting).
+    Unparseable input yields an "error_env" prediction, as in parse_predictions().
+    """
+    raw = raw.strip()
+    try:
+        action_type, kwargs = _parse_action_call(raw)
+    except Exception as e:
+        return PredictionParsed(
+            action_type="error_env",
+            action_inputs=ActionInputs(content=f"parse error: {e}"),
+            thought=thought,
+            reflection=reflection,
+            raw_action=raw,
         )
 
-    return out
+    ai = ActionInputs()
+    # UI-TARS sometimes uses "text" for typing.
+    if "content" in kwargs:
+        ai.content = str(kwargs["content"])
+    elif "text" in kwargs:
+        ai.content = str(kwargs["text"])
+    if "start_box" in kwargs:
+        ai.start_box = str(kwargs["start_box"])
+    if "end_box" in kwargs:
+        ai.end_box = str(kwargs["end_box"])
+    if "key" in kwargs:
+        ai.key = str(kwargs["key"])
+    elif "hotkey" in kwargs:
+        ai.key = str(kwargs["hotkey"])
+    if "direction" in kwargs:
+        ai.direction = str(kwargs["direction"])
+    # Optional timing helpers.
+    if "seconds" in kwargs:
+        try:
+            ai.seconds = float(kwargs["seconds"])
+        except Exception:
+            ai.seconds = None
+    if "ms" in kwargs:
+        try:
+            ai.ms = int(kwargs["ms"])
+        except Exception:
+            ai.ms = None
+    if "interval_ms" in kwargs:
+        try:
+            ai.interval_ms = int(kwargs["interval_ms"])
+        except Exception:
+            ai.interval_ms = None
+
+    return PredictionParsed(
+        action_type=action_type,
+        action_inputs=ai,
+        thought=thought,
+        reflection=reflection,
+        raw_action=raw,
+    )
@@ -3,22 +3,38 @@ from __future__ import annotations
 import queue
 import threading
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from iphoneclaw.types import SupervisorEvent
 
 
 class SupervisorHub:
-    """Thread-safe pub/sub for text-only events."""
+    """
+    Thread-safe pub/sub for text-only events.
+
+    Events carry the caller's dict as-is; JSON encoding happens on the subscriber (SSE) side,
+    so publish() on the worker thread is just a queue put per subscriber.
+    """
 
     def __init__(self) -> None:
         self._lock = threading.Lock()
-        self._subs: List["queue.Queue[SupervisorEvent]"] = []
+        # Copy-on-write: publish() reads the tuple without taking the lock.
+        self._subs: Tuple["queue.Queue[SupervisorEvent]", ...] = ()
         self._last_status: Dict[str, Any] = {"status": "init"}
 
-    def set_status(self, status: str, **extra: Any) -> None:
-        self._last_status = {"status": status, **extra}
-        self.publish("status", self._last_status)
+    def set_status(
+        self, status: str, *, extra: Optional[Dict[str, Any]] = None, **fields: Any
+    ) -> None:
+        """
+        Publish a status event. `extra` is an already-built payload (e.g. a "needs_supervisor"
+        dict) merged in as-is, so callers never have to splat it into colliding kwargs.
+        """
+        st: Dict[str, Any] = {"status": status, **fields}
+        if extra:
+            st.update(extra)
+            st["status"] = status
+        self._last_status = st
+        self.publish("status", st)
 
     def get_status(self) -> Dict[str, Any]:
         return dict(self._last_status)
@@ -26,17 +42,18 @@ class SupervisorHub:
     def subscribe(self) -> "queue.Queue[SupervisorEvent]":
         q: "queue.Queue[SupervisorEvent]" = queue.Queue(maxsize=1000)
         with self._lock:
-            self._subs.append(q)
+            self._subs = self._subs + (q,)
         return q
 
     def unsubscribe(self, q: "queue.Queue[SupervisorEvent]") -> None:
         with self._lock:
-            self._subs = [x for x in self._subs if x is not q]
+            self._subs = tuple(x for x in self._subs if x is not q)
 
     def publish(self, type_: str, data: Optional[Dict[str, Any]] = None) -> None:
+        subs = self._subs
+        if not subs:
+            return
         evt = SupervisorEvent(type=type_, data=data or {}, ts=time.time())
-        with self._lock:
-            subs = list(self._subs)
         for q in subs:
             try:
                 q.put_nowait(evt)
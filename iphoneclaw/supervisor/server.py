@@ -16,12 +16,14 @@ from iphoneclaw.macos.window import WindowFinder
 from iphoneclaw.agent.executor import execute_action
 from iphoneclaw.parse.action_parser import parse_predictions
 from iphoneclaw.automation.action_script import expand_special_predictions
+from iphoneclaw.jsonutil import dumps_bytes
 from iphoneclaw.supervisor.hub import SupervisorHub
 from iphoneclaw.supervisor.state import WorkerControl
 
 
 def _json_bytes(obj: Any) -> bytes:
-    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+    # Context/exec responses can carry long conversation text; orjson when installed.
+    return dumps_bytes(obj) + b"\n"
 
 
 class SupervisorHTTPServer:
@@ -87,7 +89,9 @@ class SupervisorHTTPServer:
                             app_name=outer.config.target_app,
                             window_contains=outer.config.window_contains,
                         )
-                        outer._capture = ScreenCapture(outer._capture_wf)
+                        outer._capture = ScreenCapture(
+                            outer._capture_wf, jpeg_backend=outer.config.capture_jpeg_backend
+                        )
                     wf = outer._capture_wf
                     cap = outer._capture
 
@@ -142,12 +146,12 @@ class SupervisorHTTPServer:
                     if not outer.recorder:
                         self._send_json(HTTPStatus.NOT_FOUND, {"error": "no recorder"})
                         return
-                    step = outer.recorder.latest_step()
-                    if not step:
+                    # Newest step whose screenshot has landed on disk (written in background).
+                    latest = outer.recorder.latest_screenshot()
+                    if latest is None:
                         self._send_json(HTTPStatus.NOT_FOUND, {"error": "no steps yet"})
                         return
-                    d = outer.recorder.step_dir(step)
-                    jpg = d + "/screenshot.jpg"
+                    step, jpg = latest
                     self._send_json(HTTPStatus.OK, {"ok": True, "step": step, "path": jpg})
                     return
 
@@ -245,7 +249,7 @@ class SupervisorHTTPServer:
                         # Initial status push
                         init = {"type": "status", "data": outer.control.snapshot(), "ts": time.time()}
                         self.wfile.write(b"event: status\n")
-                        self.wfile.write(b"data: " + json.dumps(init).encode("utf-8") + b"\n\n")
+                        self.wfile.write(b"data: " + dumps_bytes(init) + b"\n\n")
                         self.wfile.flush()
 
                         while True:
@@ -257,9 +261,19 @@ class SupervisorHTTPServer:
                                 self.wfile.flush()
                                 continue
 
-                            payload = {"type": evt.type, "data": evt.data, "ts": evt.ts}
-                            self.wfile.write(("event: %s\n" % evt.type).encode("utf-8"))
-                            self.wfile.write(b"data: " + json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n\n")
+                            # Coalesce whatever else is already queued into one write/flush.
+                            chunks = []
+                            while True:
+                                payload = {"type": evt.type, "data": evt.data, "ts": evt.ts}
+                                chunks.append(("event: %s\n" % evt.type).encode("utf-8"))
+                                chunks.append(b"data: " + dumps_bytes(payload) + b"\n\n")
+                                if len(chunks) >= 128:
+                                    break
+                                try:
+                                    evt = q.get_nowait()
+                                except queue.Empty:
+                                    break
+                            self.wfile.write(b"".join(chunks))
                             self.wfile.flush()
                     except Exception:
                         return
@@ -300,20 +314,23 @@ class SupervisorHTTPServer:
 
                 if path == "/v1/agent/pause":
                     outer.control.pause()
-                    outer.hub.set_status(outer.control.snapshot()["status"])
-                    self._send_json(HTTPStatus.OK, {"ok": True, "status": outer.control.snapshot()})
+                    snap = outer.control.snapshot()
+                    outer.hub.set_status(snap["status"])
+                    self._send_json(HTTPStatus.OK, {"ok": True, "status": snap})
                     return
 
                 if path == "/v1/agent/resume":
                     outer.control.resume()
-                    outer.hub.set_status(outer.control.snapshot()["status"])
-                    self._send_json(HTTPStatus.OK, {"ok": True, "status": outer.control.snapshot()})
+                    snap = outer.control.snapshot()
+                    outer.hub.set_status(snap["status"])
+                    self._send_json(HTTPStatus.OK, {"ok": True, "status": snap})
                     return
 
                 if path == "/v1/agent/stop":
                     outer.control.stop()
-                    outer.hub.set_status(outer.control.snapshot()["status"])
-                    self._send_json(HTTPStatus.OK, {"ok": True, "status": outer.control.snapshot()})
+                    snap = outer.control.snapshot()
+                    outer.hub.set_status(snap["status"])
+                    self._send_json(HTTPStatus.OK, {"ok": True, "status": snap})
                     return
 
                 if path == "/v1/agent/inject":
@@ -326,9 +343,10 @@ class SupervisorHTTPServer:
                         outer.control.pause()
                     if bool(body.get("resume")):
                         outer.control.resume()
-                    outer.hub.set_status(outer.control.snapshot()["status"])
+                    snap = outer.control.snapshot()
+                    outer.hub.set_status(snap["status"])
 
-                    self._send_json(HTTPStatus.OK, {"ok": True, "status": outer.control.snapshot()})
+                    self._send_json(HTTPStatus.OK, {"ok": True, "status": snap})
                     return
 
                 if path == "/v1/agent/context/clear":
@@ -351,10 +369,11 @@ class SupervisorHTTPServer:
 
                     if bool(body.get("resume")):
                         outer.control.resume()
-                    outer.hub.set_status(outer.control.snapshot()["status"])
+                    snap = outer.control.snapshot()
+                    outer.hub.set_status(snap["status"])
                     self._send_json(
                         HTTPStatus.OK,
-                        {"ok": True, "status": outer.control.snapshot(), "removed": removed},
+                        {"ok": True, "status": snap, "removed": removed},
                     )
                     return
 
@@ -401,7 +420,7 @@ class SupervisorHTTPServer:
                         max_actions = int(getattr(outer.config, "supervisor_exec_max_actions", 50) or 50)
                         for p in preds[:max_actions]:
                             res = execute_action(outer.config, p, shot)
-                            results.append(res)
+                            results.append(res.to_dict())
                         outer.hub.publish("supervisor_exec", {"count": len(results)})
                         if outer.recorder:
                             outer.recorder.log_event("supervisor_exec", {"actions": actions, "results": results})
@@ -460,8 +479,8 @@ class SupervisorHTTPServer:
                         results = []
                         for p in preds[:max_actions]:
                             res = execute_action(outer.config, p, shot)
-                            results.append(res)
-                            if not bool(res.get("ok")):
+                            results.append(res.to_dict())
+                            if not res.ok:
                                 break
                         outer.hub.publish("supervisor_exec", {"count": len(results), "script": name or script_path})
                         if outer.recorder:
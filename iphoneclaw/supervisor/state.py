@@ -15,16 +15,24 @@ class WorkerControl:
     injected: List[str] = field(default_factory=list)
 
     _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    # Set while not paused (and on stop) so a paused worker can block instead of polling.
+    _unpaused: threading.Event = field(default_factory=threading.Event, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if not self.paused or self.stopped:
+            self._unpaused.set()
 
     def pause(self) -> None:
         with self._lock:
             self.paused = True
+            self._unpaused.clear()
             if self.status == StatusEnum.RUNNING:
                 self.status = StatusEnum.PAUSE
 
     def resume(self) -> None:
         with self._lock:
             self.paused = False
+            self._unpaused.set()
             if self.status in (StatusEnum.PAUSE, StatusEnum.HANG):
                 self.status = StatusEnum.RUNNING
 
@@ -32,6 +40,7 @@ class WorkerControl:
         with self._lock:
             self.stopped = True
             self.status = StatusEnum.USER_STOPPED
+            self._unpaused.set()
 
     def set_status(self, status: StatusEnum) -> None:
         with self._lock:
@@ -49,11 +58,28 @@ class WorkerControl:
             self.injected.append(text)
 
     def pop_injected(self) -> Optional[str]:
+        # Polled every step; skip the lock in the common nothing-queued case.
+        if not self.injected:
+            return None
         with self._lock:
             if not self.injected:
                 return None
             return self.injected.pop(0)
 
+    # Cheap single-field reads for the worker hot path (no lock, no dict).
+    def is_paused(self) -> bool:
+        return self.paused
+
+    def is_stopped(self) -> bool:
+        return self.stopped
+
+    def status_value(self) -> str:
+        return self.status.value
+
+    def wait_unpaused(self, timeout: Optional[float] = None) -> bool:
+        """Block until resumed or stopped; returns False on timeout."""
+        return self._unpaused.wait(timeout)
+
     def snapshot(self) -> dict:
         with self._lock:
             return {
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Dict, Optional
 
+# dataclass(slots=True) needs Python 3.10+; 3.9 falls back to a regular dataclass.
+DATACLASS_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 class StatusEnum(str, Enum):
     INIT = "init"
@@ -16,7 +20,7 @@ class StatusEnum(str, Enum):
     ERROR = "error"
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ActionInputs:
     content: Optional[str] = None
     start_box: Optional[str] = None
@@ -31,6 +35,21 @@ class ActionInputs:
     start_coords: Optional[tuple[float, float]] = None
     end_coords: Optional[tuple[float, float]] = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        # Flat equivalent of dataclasses.asdict(): no nested dataclasses, so skip the recursive copy.
+        return {
+            "content": self.content,
+            "start_box": self.start_box,
+            "end_box": self.end_box,
+            "key": self.key,
+            "direction": self.direction,
+            "seconds": self.seconds,
+            "ms": self.ms,
+            "interval_ms": self.interval_ms,
+            "start_coords": self.start_coords,
+            "end_coords": self.end_coords,
+        }
+
 
 @dataclass
 class PredictionParsed:
@@ -39,6 +58,47 @@ class PredictionParsed:
     thought: str = ""
     reflection: Optional[str] = None
     raw_action: str = ""
+    _signature: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def signature(self) -> str:
+        """Interned "action_type|raw_action" key for repeat detection, built once per prediction."""
+        sig = self._signature
+        if sig is None:
+            sig = self._signature = sys.intern(f"{self.action_type}|{(self.raw_action or '').strip()}")
+        return sig
+
+
+@dataclass(**DATACLASS_SLOTS)
+class ActionResult:
+    """Outcome of one executed action. Serialize with to_dict() when recording/sending."""
+
+    action_type: str
+    raw_action_type: str
+    raw_action: str
+    thought: str
+    inputs: Dict[str, Any]
+    ok: bool = False
+    skipped: bool = False
+    reason: str = ""
+    error: Optional[str] = None
+    dt: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        d: Dict[str, Any] = {
+            "action_type": self.action_type,
+            "raw_action_type": self.raw_action_type,
+            "raw_action": self.raw_action,
+            "thought": self.thought,
+            "inputs": self.inputs,
+        }
+        if self.skipped:
+            d["skipped"] = True
+            d["reason"] = self.reason
+        d["ok"] = self.ok
+        if self.error is not None:
+            d["error"] = self.error
+        d["dt"] = self.dt
+        return d
 
 
 @dataclass
@@ -51,13 +111,14 @@ class Rect:
 
 @dataclass
 class ScreenshotOutput:
-    base64: str
+    # Encoded JPEG of the (possibly cropped) window image.
+    jpeg: bytes = field(repr=False)
     scale_factor: float
     window_bounds: Rect
     image_width: int = 0
     image_height: int = 0
     # Optional: crop rectangle in *pixel coordinates* relative to the raw captured window image:
-    # (x, y, width, height). When set, base64/image_width/image_height/window_bounds correspond
+    # (x, y, width, height). When set, jpeg/image_width/image_height/window_bounds correspond
     # to the cropped region.
     crop_rect_px: Optional[tuple[int, int, int, int]] = None
     raw_image_width: int = 0
@@ -1,5 +1,4 @@
 """Test home screen swipe at different Y positions."""
-import base64
 import sys
 import time
 from iphoneclaw.macos.window import WindowFinder
@@ -9,7 +8,7 @@ from iphoneclaw.macos import input_mouse
 
 def save_shot(shot, path):
     with open(path, "wb") as f:
-        f.write(base64.b64decode(shot.base64))
+        f.write(shot.jpeg)
     print(f"  saved: {path}")
 
 def main():
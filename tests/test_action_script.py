@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import os
+
 import pytest
 
 from iphoneclaw.automation.action_script import script_to_action_calls, script_to_predictions
 from iphoneclaw.automation.action_script import run_script_to_predictions
 from iphoneclaw.automation.action_script import expand_special_predictions
 from iphoneclaw.automation.action_script import ScriptParseError
+from iphoneclaw.automation.script_registry import load_registry
 
 
 def test_script_parses_compound_example() -> None:
@@ -71,3 +74,53 @@ def test_circular_include_raises_error(tmp_path) -> None:
             registry_path="./action_scripts/registry.json",
             max_expand_depth=8,
         )
+
+
+def test_registry_is_reloaded_when_file_changes(tmp_path) -> None:
+    reg = tmp_path / "registry.json"
+    reg.write_text('{"a": "a.txt"}', encoding="utf-8")
+    first = load_registry(str(reg))
+    assert first == {"a": "a.txt"}
+    first["b"] = "mutated"
+    assert load_registry(str(reg)) == {"a": "a.txt"}
+
+    reg.write_text('{"a": "a.txt", "b": "b.txt"}', encoding="utf-8")
+    st = os.stat(reg)
+    os.utime(reg, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert load_registry(str(reg)) == {"a": "a.txt", "b": "b.txt"}
+
+
+def test_dsl_quoted_tokens_match_shlex() -> None:
+    src = "include 'my scripts/x.txt' APP=\"b c\" x 2\nhotkey cmd\\ space"
+    calls = script_to_action_calls(src)
+    assert calls == [
+        'run_script(path="my scripts/x.txt", vars={"APP": "b c"})',
+        'run_script(path="my scripts/x.txt", vars={"APP": "b c"})',
+        'hotkey(key="cmd space")',
+    ]
+
+
+def test_script_file_is_reparsed_when_it_changes(tmp_path, monkeypatch) -> None:
+    script = tmp_path / "s.txt"
+    script.write_text("swipe ${DIR}\n", encoding="utf-8")
+    call = f"run_script(path='{script}', DIR='left')"
+    first = run_script_to_predictions(call, registry_path="./action_scripts/registry.json")
+    again = run_script_to_predictions(call, registry_path="./action_scripts/registry.json")
+    assert [p.action_inputs.direction for p in first] == ["left"]
+    assert again == first and again is not first
+
+    script.write_text("swipe ${DIR}\nswipe ${DIR2}\n", encoding="utf-8")
+    st = os.stat(script)
+    os.utime(script, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    monkeypatch.setenv("DIR2", "up")
+    preds = run_script_to_predictions(call, registry_path="./action_scripts/registry.json")
+    assert [p.action_inputs.direction for p in preds] == ["left", "up"]
+    monkeypatch.setenv("DIR2", "down")
+    preds = run_script_to_predictions(call, registry_path="./action_scripts/registry.json")
+    assert [p.action_inputs.direction for p in preds] == ["left", "down"]
+
+
+def test_escaped_quotes_in_type_content_do_not_swallow_later_actions() -> None:
+    preds = script_to_predictions('type say "hi\nwait\nswipe left')
+    assert [p.action_type for p in preds] == ["type", "wait", "swipe"]
+    assert preds[0].action_inputs.content == 'say "hi'
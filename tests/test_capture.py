@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import pytest
+
+Quartz = pytest.importorskip("Quartz")
+AppKit = pytest.importorskip("AppKit")
+pytest.importorskip("numpy")
+turbojpeg = pytest.importorskip("turbojpeg")
+
+from iphoneclaw.macos import capture  # noqa: E402
+
+if capture._turbojpeg() is None:
+    pytest.skip("libjpeg-turbo is not loadable", allow_module_level=True)
+
+_RGB = (220, 30, 60)
+
+
+def _bitmap(bitmap_info: int):
+    w, h = 32, 32
+    ctx = Quartz.CGBitmapContextCreate(None, w, h, 8, 0, Quartz.CGColorSpaceCreateDeviceRGB(), bitmap_info)
+    r, g, b = _RGB
+    Quartz.CGContextSetRGBFillColor(ctx, r / 255.0, g / 255.0, b / 255.0, 1.0)
+    Quartz.CGContextFillRect(ctx, Quartz.CGRectMake(0, 0, w, h))
+    image = Quartz.CGBitmapContextCreateImage(ctx)
+    return AppKit.NSBitmapImageRep.alloc().initWithCGImage_(image)
+
+
+@pytest.mark.parametrize(
+    "bitmap_info",
+    [
+        # The layout window captures come back in (BGRA in memory).
+        Quartz.kCGImageAlphaPremultipliedFirst | Quartz.kCGBitmapByteOrder32Little,
+        Quartz.kCGImageAlphaNoneSkipFirst | Quartz.kCGBitmapByteOrder32Little,
+        Quartz.kCGImageAlphaPremultipliedLast | Quartz.kCGBitmapByteOrder32Big,
+        Quartz.kCGImageAlphaNoneSkipLast | Quartz.kCGBitmapByteOrder32Big,
+    ],
+)
+def test_turbo_encode_keeps_channel_order(bitmap_info) -> None:
+    jpeg = capture._encode_jpeg_turbo(_bitmap(bitmap_info), capture._JPEG_QUALITY)
+    assert jpeg is not None
+    pix = capture._turbojpeg().decode(jpeg, pixel_format=turbojpeg.TJPF_RGB)
+    r, g, b = (int(v) for v in pix[16, 16])
+    assert abs(r - _RGB[0]) <= 8 and abs(g - _RGB[1]) <= 8 and abs(b - _RGB[2]) <= 8
+
+
+def test_unknown_layout_falls_back_to_appkit() -> None:
+    fmt = capture._turbo_pixel_format(turbojpeg, 4, capture._NS_FLOAT, True)
+    assert fmt is None
+    assert capture._turbo_pixel_format(turbojpeg, 2, 0, False) is None
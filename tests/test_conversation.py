@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from iphoneclaw.agent.conversation import ConversationStore
+
+
+def _store(rounds: int) -> ConversationStore:
+    conv = ConversationStore()
+    conv.add("system", "sys")
+    for i in range(rounds):
+        conv.add("user", "u%d" % i)
+        conv.add("assistant", "a%d" % i)
+    return conv
+
+
+def test_tail_rounds_includes_triggering_user() -> None:
+    conv = _store(5)
+    tail = conv.tail_rounds(2)
+    assert [t["text"] for t in tail] == ["u3", "a3", "u4", "a4"]
+
+
+def test_tail_rounds_returns_all_when_short() -> None:
+    conv = _store(2)
+    msgs = conv.to_openai_messages(include_system=False, tail_rounds=8)
+    assert [m["content"] for m in msgs] == ["u0", "a0", "u1", "a1"]
+
+
+def test_trim_then_tail_stays_consistent() -> None:
+    conv = _store(4)
+    conv.add("user", "pending")
+    assert conv.trim_tail_rounds(2) == 4
+    assert [it.text for it in conv.items()] == ["sys", "u0", "a0", "u1", "a1", "pending"]
+    tail = conv.tail_rounds(1)
+    assert [t["text"] for t in tail] == ["u1", "a1", "pending"]
+    conv.add("assistant", "a9")
+    assert [t["text"] for t in conv.tail_rounds(1)] == ["pending", "a9"]
+
+
+def test_clear_keeps_last_system() -> None:
+    conv = _store(3)
+    conv.add("system", "sys2")
+    assert conv.clear() == 7
+    assert [it.text for it in conv.items()] == ["sys2"]
+    conv.add("user", "u")
+    conv.add("assistant", "a")
+    assert [t["text"] for t in conv.tail_rounds(1)] == ["u", "a"]
+
+
+def test_openai_messages_reuse_item_dicts() -> None:
+    conv = _store(2)
+    first = conv.to_openai_messages(tail_rounds=8)
+    second = conv.to_openai_messages(tail_rounds=8)
+    assert first == second
+    assert first is not second
+    assert all(a is b for a, b in zip(first, second))
+    assert [m["role"] for m in conv.to_openai_messages(include_system=False)] == [
+        "user", "assistant", "user", "assistant",
+    ]
+
+
+def test_max_items_evicts_whole_rounds_and_keeps_system() -> None:
+    conv = ConversationStore(max_items=5)
+    conv.add("system", "sys")
+    for i in range(4):
+        conv.add("user", "u%d" % i)
+        conv.add("assistant", "a%d" % i)
+    assert [it.text for it in conv.items()] == ["sys", "u2", "a2", "u3", "a3"]
+    assert [t["text"] for t in conv.tail_rounds(2)] == ["u2", "a2", "u3", "a3"]
+    assert [t["text"] for t in conv.tail_rounds(8)] == ["sys", "u2", "a2", "u3", "a3"]
+    msgs = conv.to_openai_messages(include_system=False, tail_rounds=8)
+    assert msgs[0]["role"] == "user"
+    conv.clear()
+    assert [it.text for it in conv.items()] == ["sys"]
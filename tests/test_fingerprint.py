@@ -112,6 +112,11 @@ class TestDhash:
         h2 = dhash(b64)
         assert h1 == h2
 
+    def test_raw_bytes_match_base64(self):
+        """Raw JPEG bytes hash the same as their base64 form."""
+        b64 = _make_gradient_jpeg()
+        assert dhash(base64.b64decode(b64)) == dhash(b64)
+
     def test_invalid_base64_returns_none(self):
         assert dhash("not-valid-base64!!!") is None
 
@@ -59,6 +59,16 @@ class TestL0CacheStore:
         entry = cache.lookup(1000)
         assert entry is not None
 
+    def test_failed_exact_entry_falls_back_to_near_match(self):
+        cache = L0Cache(hash_threshold=5, max_reuse=3)
+        cache.store(1000, [_pred()], post_fingerprint=2000, step=1)
+        cache.store(1003, [_pred()], post_fingerprint=2000, step=2)
+        cache.mark_failed(cache.lookup(1000))
+
+        entry = cache.lookup(1000)
+        assert entry is not None
+        assert entry.fingerprint == 1003
+
 
 class TestL0CacheReuse:
     def test_max_reuse_exhaustion(self):
@@ -130,6 +140,18 @@ class TestL0CacheCapacity:
         assert cache.lookup(300) is not None
         assert cache.lookup(400) is not None
 
+    def test_hit_refreshes_recency(self):
+        cache = L0Cache(hash_threshold=0, max_reuse=3, max_entries=2)
+        cache.store(100, [_pred()], post_fingerprint=200, step=1)
+        cache.store(200, [_pred()], post_fingerprint=300, step=2)
+        cache.record_hit(cache.lookup(100), step=3)
+
+        # 200 is now the least recently used entry.
+        cache.store(300, [_pred()], post_fingerprint=400, step=4)
+        assert cache.lookup(200) is None
+        assert cache.lookup(100) is not None
+        assert cache.lookup(300) is not None
+
     def test_overwrite_existing_fingerprint_no_eviction(self):
         cache = L0Cache(hash_threshold=0, max_reuse=3, max_entries=2)
         cache.store(100, [_pred("click")], post_fingerprint=200, step=1)
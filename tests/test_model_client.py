@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from iphoneclaw.model.client import OpenAICompatClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    peers: list = []
+    status = 200
+    drop = False
+    encodings: list = []
+    reject_encoded = False
+
+    def do_POST(self) -> None:
+        raw = self.rfile.read(int(self.headers["Content-Length"]))
+        type(self).peers.append(self.client_address)
+        enc = self.headers.get("Content-Encoding")
+        type(self).encodings.append(enc)
+        if enc == "gzip":
+            raw = gzip.decompress(raw)
+        body = json.loads(raw)
+        if enc and type(self).reject_encoded:
+            out = b'{"error": "unsupported"}'
+            self.send_response(415)
+        elif type(self).status != 200:
+            out = b'{"error": "nope"}'
+            self.send_response(type(self).status)
+        else:
+            out = json.dumps({
+                "choices": [{"message": {"content": "echo:%s" % body["messages"][-1]["content"]}}],
+                "usage": {"total_tokens": 7},
+            }).encode()
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+        if type(self).drop:
+            # Close without announcing it, like a server reaping an idle keep-alive socket.
+            self.close_connection = True
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture()
+def server(monkeypatch):
+    for var in ("http_proxy", "HTTP_PROXY", "https_proxy", "HTTPS_PROXY", "all_proxy", "ALL_PROXY"):
+        monkeypatch.delenv(var, raising=False)
+    _Handler.peers = []
+    _Handler.status = 200
+    _Handler.drop = False
+    _Handler.encodings = []
+    _Handler.reject_encoded = False
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _client(srv, **kw) -> OpenAICompatClient:
+    host, port = srv.server_address[:2]
+    return OpenAICompatClient("http://%s:%d/v1/" % (host, port), "k", "m", **kw)
+
+
+def test_requests_reuse_one_connection(server) -> None:
+    client = _client(server)
+    for i in range(3):
+        text, tokens = client.chat_completions([{"role": "user", "content": "hi%d" % i}])
+        assert text == "echo:hi%d" % i
+        assert tokens == 7
+    assert len(server.RequestHandlerClass.peers) == 3
+    assert len(set(server.RequestHandlerClass.peers)) == 1
+    client.close()
+
+
+def test_non_ascii_content_round_trips(server) -> None:
+    client = _client(server)
+    text, _ = client.chat_completions([{"role": "user", "content": "打开设置"}])
+    assert text == "echo:打开设置"
+
+
+def test_reconnects_after_server_drops_connection(server) -> None:
+    _Handler.drop = True
+    client = _client(server)
+    client.chat_completions([{"role": "user", "content": "a"}])
+    time.sleep(0.05)
+    text, _ = client.chat_completions([{"role": "user", "content": "b"}], retries=1)
+    assert text == "echo:b"
+    assert len(set(server.RequestHandlerClass.peers)) == 2
+
+
+def test_http_error_is_not_retried_for_4xx(server) -> None:
+    _Handler.status = 400
+    client = _client(server)
+    with pytest.raises(RuntimeError, match="Model HTTP error 400"):
+        client.chat_completions([{"role": "user", "content": "x"}], retries=3)
+    assert len(server.RequestHandlerClass.peers) == 1
+
+
+def test_redirect_is_reported_as_http_error(server) -> None:
+    _Handler.status = 307
+    client = _client(server)
+    with pytest.raises(RuntimeError, match="Model HTTP error 307"):
+        client.chat_completions([{"role": "user", "content": "x"}], retries=3)
+    assert len(server.RequestHandlerClass.peers) == 1
+
+
+def test_large_bodies_are_gzip_encoded_when_enabled(server) -> None:
+    client = _client(server, request_encoding="gzip")
+    big = "x" * 64 * 1024
+    text, _ = client.chat_completions([{"role": "user", "content": big}])
+    assert text == "echo:" + big
+    client.chat_completions([{"role": "user", "content": "small"}])
+    assert _Handler.encodings == ["gzip", None]
+
+
+def test_unsupported_encoding_falls_back_to_identity(server) -> None:
+    _Handler.reject_encoded = True
+    client = _client(server, request_encoding="gzip")
+    big = "y" * 64 * 1024
+    for _ in range(2):
+        text, _ = client.chat_completions([{"role": "user", "content": big}], retries=1)
+        assert text == "echo:" + big
+    assert _Handler.encodings == ["gzip", None, None]
+    assert client.request_encoding == ""
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from iphoneclaw.agent import recorder
+from iphoneclaw.agent.recorder import RunRecorder
+from iphoneclaw.config import Config
+from iphoneclaw.types import Rect, ScreenshotOutput
+
+
+def _recorder(tmp_path) -> RunRecorder:
+    cfg = Config()
+    cfg.record_dir = str(tmp_path)
+    return RunRecorder(cfg, run_id="r")
+
+
+def test_log_lines_are_written_in_order_after_flush(tmp_path) -> None:
+    rec = _recorder(tmp_path)
+    for i in range(100):
+        rec.log_event("exec", {"i": i})
+        rec.log_conversation("user", "u%d" % i, injected=bool(i % 2))
+    rec.flush()
+
+    with open(rec.events_path, encoding="utf-8") as f:
+        events = [json.loads(line) for line in f]
+    assert [e["data"]["i"] for e in events] == list(range(100))
+    with open(rec.conversation_path, encoding="utf-8") as f:
+        conv = [json.loads(line) for line in f]
+    assert [c["text"] for c in conv] == ["u%d" % i for i in range(100)]
+    assert conv[1]["meta"] == {"injected": True}
+
+
+def test_logged_payload_is_snapshotted_at_call_time(tmp_path) -> None:
+    rec = _recorder(tmp_path)
+    payload = {"step": 1}
+    rec.log_event("exec", payload)
+    payload["step"] = 2
+    rec.flush()
+
+    with open(rec.events_path, encoding="utf-8") as f:
+        assert json.loads(f.readline())["data"] == {"step": 1}
+
+
+def test_write_step_parts_land_in_one_step_dir(tmp_path) -> None:
+    rec = _recorder(tmp_path)
+    d1 = rec.write_step(3, raw_model_text="hi")
+    d2 = rec.write_step(3, action={"actions": []}, exec_result={"ok": True})
+    assert d1 == d2 == rec.step_dir(3)
+    rec.flush()
+    assert sorted(os.listdir(d1)) == ["action.json", "exec.json", "model.txt"]
+    assert rec.latest_step() == 3
+
+
+def test_step_files_match_synchronous_json_dump(tmp_path) -> None:
+    rec = _recorder(tmp_path)
+    action = {"actions": [{"raw_action": "type(content='你好')", "inputs": {"ms": None}}]}
+    d = rec.write_step(1, raw_model_text="Thought: 好\nAction: wait()", action=action)
+    rec.flush()
+
+    with open(os.path.join(d, "model.txt"), encoding="utf-8") as f:
+        assert f.read() == "Thought: 好\nAction: wait()"
+    with open(os.path.join(d, "action.json"), encoding="utf-8") as f:
+        assert f.read() == json.dumps(action, ensure_ascii=False, indent=2)
+
+
+def test_failed_write_does_not_drop_the_rest_of_the_batch(tmp_path, monkeypatch) -> None:
+    def fail(path: str, data: bytes) -> None:
+        raise OSError("disk full")
+
+    # Whole-file writes run before the batch's JSONL appends, so a failing step file
+    # queued last would have taken the events down with it.
+    monkeypatch.setattr(recorder, "_replace_file", fail)
+    rec = _recorder(tmp_path)
+    for i in range(10):
+        rec.log_event("exec", {"i": i})
+    rec.write_step(1, raw_model_text="x")
+    with pytest.raises(OSError, match="disk full"):
+        rec.flush()
+    rec.flush()
+
+    with open(rec.events_path, encoding="utf-8") as f:
+        assert [json.loads(line)["data"]["i"] for line in f] == list(range(10))
+
+
+def test_latest_screenshot_skips_steps_without_one(tmp_path) -> None:
+    rec = _recorder(tmp_path)
+    shot = ScreenshotOutput(jpeg=b"\xff\xd8jpeg", scale_factor=1.0, window_bounds=Rect(0, 0, 10, 10))
+    assert rec.latest_screenshot() is None
+    rec.write_step(1, screenshot=shot)
+    rec.write_step(2, raw_model_text="no screenshot yet")
+    rec.flush()
+
+    step, path = rec.latest_screenshot()
+    assert step == 1
+    with open(path, "rb") as f:
+        assert f.read() == b"\xff\xd8jpeg"
+    assert not any(n.endswith(".tmp") for n in os.listdir(rec.step_dir(1)))
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from iphoneclaw.supervisor.state import WorkerControl
+from iphoneclaw.types import StatusEnum
+
+
+def test_accessors_track_pause_and_stop() -> None:
+    ctl = WorkerControl()
+    ctl.set_status(StatusEnum.RUNNING)
+    assert not ctl.is_paused() and not ctl.is_stopped()
+    assert ctl.status_value() == StatusEnum.RUNNING.value
+
+    ctl.pause()
+    assert ctl.is_paused()
+    assert ctl.status_value() == StatusEnum.PAUSE.value
+    assert ctl.wait_unpaused(0.01) is False
+
+    ctl.stop()
+    assert ctl.is_stopped()
+    assert ctl.wait_unpaused(0.01) is True
+
+
+def test_wait_unpaused_wakes_on_resume() -> None:
+    ctl = WorkerControl()
+    ctl.pause()
+    threading.Timer(0.05, ctl.resume).start()
+    t0 = time.monotonic()
+    assert ctl.wait_unpaused(5.0) is True
+    assert time.monotonic() - t0 < 1.0
+    assert not ctl.is_paused()